@@ -6,42 +6,63 @@ CALDROS-GTO | ai_adaptation/meta_loop.py
 自进化循环：持续优化信号、参数、结构，保持系统适应性
 """
 
-import time
+import asyncio
 import logging
 from caldros_gto.ai_adaptation.trainer import Trainer
 from caldros_gto.ai_adaptation.evaluator import Evaluator
 
 logger = logging.getLogger("MetaLoop")
 
+
+def _retrain_and_evaluate(trainer, evaluator):
+    """在进程池中执行：重新训练并评估，连同训练后的 trainer 一起返回以同步模型状态"""
+    trainer.retrain_models()
+    return trainer, evaluator.evaluate_performance()
+
+
 class MetaLearningLoop:
-    def __init__(self, cfg):
+    def __init__(self, cfg, executor=None):
+        """
+        :param cfg: production.json 配置
+        :param executor: 用于重训练的 ProcessPoolExecutor；为空时使用事件循环默认线程池
+        """
         self.cfg = cfg
         self.trainer = Trainer(cfg)
         self.evaluator = Evaluator(cfg)
+        self.executor = executor
+        self._stop_event = asyncio.Event()
 
-    def run(self):
+    def stop(self):
+        """请求退出循环（立即唤醒等待中的 run）"""
+        self._stop_event.set()
+
+    async def run(self):
         logger.info("🧬 启动自进化循环...")
-        while True:
+        loop = asyncio.get_running_loop()
+        while not self._stop_event.is_set():
             # 1️⃣ 收集最新数据 & 信号结果
             self.trainer.collect_training_data()
 
-            # 2️⃣ 重新训练贝叶斯模型 & RL 策略
-            self.trainer.retrain_models()
-
-            # 3️⃣ 性能评估与对比
-            perf = self.evaluator.evaluate_performance()
-            logger.info(f"📈 当前策略表现: {perf}")
+            # 2️⃣ 重新训练贝叶斯模型 & RL 策略 + 3️⃣ 性能评估与对比
+            # CPU 密集，放到独立进程执行，避免与行情采集争用 GIL
+            self.trainer, perf = await loop.run_in_executor(
+                self.executor, _retrain_and_evaluate, self.trainer, self.evaluator
+            )
+            logger.info("📈 当前策略表现: %s", perf)
 
             # 4️⃣ 若EV漂移 > 阈值 → 自动替换策略
             if perf["ev_drift"] > 0.15 or perf["win_rate"] < 0.45:
                 self.trainer.mutate_strategy()
                 logger.warning("⚠️ 策略漂移检测，已触发结构进化！")
 
-            # 5️⃣ 等待下一轮（默认6小时）
-            time.sleep(21600)
+            # 5️⃣ 等待下一轮（默认6小时），stop() 可随时打断
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=21600)
+            except asyncio.TimeoutError:
+                pass
 
 if __name__ == "__main__":
     from utils.config_loader import load_config
     cfg = load_config("production.json")
     loop = MetaLearningLoop(cfg)
-    loop.run()
+    asyncio.run(loop.run())
@@ -13,13 +13,18 @@ from datetime import datetime
 
 logger = logging.getLogger("AIAdaptation")
 
+EV_HISTORY_SIZE = 1000  # 盈利/亏损 EV 环形缓冲区容量
+
 class AIAdaptationEngine:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.signal_stats = {}
         self.model_state = {}
-        self.win_history = []
-        self.loss_history = []
+        # 实际 EV 环形缓冲区（预分配），_win_n / _loss_n 为累计写入次数
+        self.win_history = np.zeros(EV_HISTORY_SIZE)
+        self.loss_history = np.zeros(EV_HISTORY_SIZE)
+        self._win_n = 0
+        self._loss_n = 0
         self.shadow_results = []
 
     # === 核心入口：每笔交易完成后调用 ===
@@ -31,54 +36,59 @@ class AIAdaptationEngine:
         :param ev_predicted: 交易前预测 EV
         :param ev_realized: 实际 EV
         """
-        stats = self.signal_stats.setdefault(signal_name, {"total": 0, "win": 0, "ev_error_sum": 0})
+        stats = self.signal_stats.setdefault(signal_name, {"total": 0, "win": 0, "win_rate": 0.0, "ev_error_sum": 0})
         stats["total"] += 1
         if result:
             stats["win"] += 1
-            self.win_history.append(ev_realized)
+            self.win_history[self._win_n % EV_HISTORY_SIZE] = ev_realized
+            self._win_n += 1
         else:
-            self.loss_history.append(ev_realized)
+            self.loss_history[self._loss_n % EV_HISTORY_SIZE] = ev_realized
+            self._loss_n += 1
+        stats["win_rate"] = stats["win"] / stats["total"]
         stats["ev_error_sum"] += abs(ev_realized - ev_predicted)
 
-        logger.info(f"[AI] Signal {signal_name} updated: win_rate={self.get_win_rate(signal_name):.2%}")
+        logger.info("[AI] Signal %s updated: win_rate=%.2f%%", signal_name, stats["win_rate"] * 100)
 
     # === 胜率估计与信号优胜劣汰 ===
     def get_win_rate(self, signal_name: str) -> float:
-        stats = self.signal_stats.get(signal_name, {"total": 1, "win": 0})
-        return stats["win"] / stats["total"]
+        stats = self.signal_stats.get(signal_name)
+        return stats["win_rate"] if stats else 0.0
 
     def prune_low_performance_signals(self, min_win_rate: float = 0.45):
         """
         删除低于门槛的信号（自动剪枝）
         """
-        for signal, stats in list(self.signal_stats.items()):
-            win_rate = self.get_win_rate(signal)
-            if stats["total"] >= 100 and win_rate < min_win_rate:
-                logger.warning(f"[AI] Pruning underperforming signal: {signal} ({win_rate:.2%})")
-                del self.signal_stats[signal]
+        to_delete = [
+            signal for signal, stats in self.signal_stats.items()
+            if stats["total"] >= 100 and stats["win_rate"] < min_win_rate
+        ]
+        for signal in to_delete:
+            logger.warning("[AI] Pruning underperforming signal: %s (%.2f%%)", signal, self.signal_stats[signal]["win_rate"] * 100)
+            del self.signal_stats[signal]
 
     # === 贝叶斯胜率修正 ===
     def bayesian_update_winrate(self, prior_alpha: int = 10, prior_beta: int = 6) -> Dict[str, float]:
         """
         使用贝叶斯方法修正信号胜率分布
         """
-        posteriors = {}
-        for signal, stats in self.signal_stats.items():
-            alpha_post = prior_alpha + stats["win"]
-            beta_post = prior_beta + stats["total"] - stats["win"]
-            posteriors[signal] = alpha_post / (alpha_post + beta_post)
-        return posteriors
+        stats = self.signal_stats.values()
+        wins = np.fromiter((s["win"] for s in stats), dtype=np.int64, count=len(stats))
+        totals = np.fromiter((s["total"] for s in stats), dtype=np.int64, count=len(stats))
+        # α_post / (α_post + β_post)，其中 α_post = α + win，β_post = β + total - win
+        posteriors = (prior_alpha + wins) / (prior_alpha + prior_beta + totals)
+        return dict(zip(self.signal_stats, posteriors.tolist()))
 
     # === EV 预测误差回馈调整 ===
     def ev_drift_monitor(self) -> float:
         """
         计算 EV 预测误差的偏移（drift），用于模型调优
         """
-        errors = [abs(ev_r - ev_p) for s, stats in self.signal_stats.items() for ev_r, ev_p in zip(self.win_history, self.loss_history)]
-        if not errors:
+        n = min(self._win_n, self._loss_n, EV_HISTORY_SIZE)
+        if n == 0:
             return 0.0
-        drift = np.mean(errors)
-        logger.info(f"[AI] EV drift measured: {drift:.4f}")
+        drift = float(np.mean(np.abs(self.win_history[:n] - self.loss_history[:n])))
+        logger.info("[AI] EV drift measured: %.4f", drift)
         return drift
 
     # === 强化学习式信号加权 ===
@@ -88,9 +98,9 @@ class AIAdaptationEngine:
         """
         weights = {}
         for signal, stats in self.signal_stats.items():
-            win_rate = self.get_win_rate(signal)
+            win_rate = stats["win_rate"]
             weights[signal] = min(1.0, max(0.0, weights.get(signal, 0.1) + learning_rate * (win_rate - 0.5)))
-        logger.info(f"[AI] Adaptive signal weights: {weights}")
+        logger.info("[AI] Adaptive signal weights: %s", weights)
         return weights
 
     # === 元学习：根据市场状态微调参数 ===
@@ -122,7 +132,7 @@ class AIAdaptationEngine:
             simulated_ev = strat.simulate()
             results.append({"name": strat.name, "ev": simulated_ev, "timestamp": datetime.utcnow()})
         self.shadow_results.extend(results)
-        logger.info(f"[AI] Shadow experiments complete: {results}")
+        logger.info("[AI] Shadow experiments complete: %s", results)
         return results
 
     # === Canary Rollout：逐步上线 ===
@@ -132,5 +142,5 @@ class AIAdaptationEngine:
         """
         for strat in self.shadow_results:
             if strat["ev"] > performance_threshold:
-                logger.info(f"[AI] Promoting {strat['name']} to production.")
+                logger.info("[AI] Promoting %s to production.", strat["name"])
                 # ✅ 实际系统中可调用部署 API
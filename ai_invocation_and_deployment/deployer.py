@@ -49,7 +49,7 @@ class Deployer:
             return
 
         for target in llm_conf["targets"]:
-            logger.info(f"[Deployer] 🔨 Generating code for: {target}")
+            logger.info("[Deployer] 🔨 Generating code for: %s", target)
             # ⚠️ 实际环境中：调用 GPT-5 / DeepSeek API 自动生成 Python 模块
             # 这里用占位符模拟生成
             target_path = self.project_root / target
@@ -65,7 +65,7 @@ class Deployer:
         logger.info("[Deployer] 📊 Running historical backtest...")
         backtester = Backtester(self.config)
         metrics = backtester.run()
-        logger.info(f"[Deployer] ✅ Backtest complete: {metrics}")
+        logger.info("[Deployer] ✅ Backtest complete: %s", metrics)
         return metrics
 
     # === 5️⃣ 压力测试 & 仿真 ===
@@ -74,9 +74,9 @@ class Deployer:
             logger.info("[Deployer] Skipping simulations.")
             return
         scenarios = self.config["simulation_scenarios"]["scenarios"]
-        logger.info(f"[Deployer] 🧪 Running stress simulations: {scenarios}")
+        logger.info("[Deployer] 🧪 Running stress simulations: %s", scenarios)
         for s in scenarios:
-            logger.info(f" - Simulating: {s}")
+            logger.info(" - Simulating: %s", s)
             time.sleep(1)
         logger.info("[Deployer] ✅ Simulation stress tests completed.")
 
@@ -85,14 +85,14 @@ class Deployer:
         logger.info("[Deployer] 🐳 Building Docker image...")
         image_name = "caldros_gto:latest"
         subprocess.run(["docker", "build", "-t", image_name, "."], check=True)
-        logger.info(f"[Deployer] ✅ Docker image built: {image_name}")
+        logger.info("[Deployer] ✅ Docker image built: %s", image_name)
         return image_name
 
     # === 7️⃣ 部署到云平台（Zeabur / Docker Run）===
     def deploy_to_cloud(self, image_name: str):
         cloud_conf = self.config["ai_invocation_and_deployment"]["cloud_environment"]
         provider = cloud_conf["provider"]
-        logger.info(f"[Deployer] ☁️ Deploying to cloud provider: {provider}")
+        logger.info("[Deployer] ☁️ Deploying to cloud provider: %s", provider)
 
         if provider.lower() == "zeabur":
             # ⚠️ 实际生产中应使用 Zeabur CLI / API
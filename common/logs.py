@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CALDROS-GTO V19 | common/logs.py
+日志工具：高频日志限流、内存缓冲日志的定时刷新
+"""
+
+import time
+import logging
+import threading
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    令牌桶限流：WARNING 及以上全部放行，INFO/DEBUG 超出速率时丢弃并计数；
+    限流结束后放行的第一条记录会附带期间丢弃的条数
+    """
+
+    def __init__(self, rate: float = 50.0, burst: float = 200.0):
+        super().__init__()
+        self._rate = rate
+        self._burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self.dropped = 0        # 自上次放行以来丢弃的条数
+        self.dropped_total = 0  # 累计丢弃条数
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._last) * self._rate)
+            self._last = now
+            if self._tokens < 1.0:
+                self.dropped += 1
+                self.dropped_total += 1
+                return False
+            self._tokens -= 1.0
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            record.msg = "%s（限流丢弃 %d 条）" % (record.getMessage(), dropped)
+            record.args = None
+        return True
+
+
+def start_periodic_flush(handler: logging.Handler, interval: float = 5.0) -> threading.Event:
+    """
+    在守护线程中每 interval 秒调用一次 handler.flush()，避免低流量时缓冲日志长时间滞留；
+    返回的 Event 置位即停止
+    """
+    stop = threading.Event()
+
+    def _loop():
+        while not stop.wait(interval):
+            handler.flush()
+
+    threading.Thread(target=_loop, name="log-flush", daemon=True).start()
+    return stop
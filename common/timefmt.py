@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CALDROS-GTO V19 | common/timefmt.py
+时间格式化：全系统统一的 UTC ISO 8601 时间戳（秒精度，Z 后缀）
+"""
+
+import time
+from typing import Optional
+
+
+def iso_utc(sec: Optional[float] = None) -> str:
+    """
+    Unix 秒 → "YYYY-MM-DDTHH:MM:SSZ"；sec 为空时取当前时间。直接由 time.gmtime 拼接，不经 datetime 对象
+    """
+    tm = time.gmtime(sec)
+    return f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}Z"
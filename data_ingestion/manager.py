@@ -7,17 +7,96 @@ CALDROS-GTO V19 | data_ingestion/manager.py
 """
 
 import asyncio
+import heapq
 import json
 import time
 import logging
 import aiohttp
 import websockets
+import numpy as np
+import multiprocessing as mp
 from collections import deque
 from datetime import datetime
+from multiprocessing.shared_memory import SharedMemory
 from typing import Dict, Any, List
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # 未安装 orjson 时回退标准库
+    _json_loads = json.loads
+
 logger = logging.getLogger("DataIngestion")
 
+PRICE_WINDOW = 50  # 每个交易对保留的成交样本数（环形缓冲区长度）
+LIQ_WINDOW = 100   # 每个交易对保留的清算事件数
+
+
+# === 共享内存环形缓冲区：事件循环只写样本，特征计算在子进程完成 ===
+def _ring_layout(n: int):
+    """
+    共享内存布局：(名称, 形状, dtype)，按顺序紧密排列，行 = 交易对
+    价格 / 数量 / 清算额用 float32 减半内存带宽；时间戳保留 float64，避免 Δt 精度损失
+    """
+    return (
+        ("t", (n, PRICE_WINDOW), np.float64),
+        ("p", (n, PRICE_WINDOW), np.float32),
+        ("q", (n, PRICE_WINDOW), np.float32),
+        ("head", (n,), np.int64),            # 累计写入次数
+        ("liq", (n, LIQ_WINDOW), np.float32),
+        ("liq_head", (n,), np.int64),
+        ("features", (n, 3), np.float64)     # 价格速度 / 成交量加速度 / 清算热度
+    )
+
+
+def _ring_nbytes(n: int) -> int:
+    return sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for _, shape, dtype in _ring_layout(n))
+
+
+def _ring_views(buf, n: int) -> Dict[str, np.ndarray]:
+    """把共享内存切分为各数组视图"""
+    views, offset = {}, 0
+    for name, shape, dtype in _ring_layout(n):
+        views[name] = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+        offset += views[name].nbytes
+    return views
+
+
+def _compute_features_into(ring: Dict[str, np.ndarray]):
+    """一次性向量化计算全部交易对特征，写回 ring["features"]"""
+    head = ring["head"]
+    rows = np.arange(head.size)
+
+    # 价格动量（环形缓冲区中最旧 → 最新样本）
+    newest = (head - 1) % PRICE_WINDOW
+    oldest = np.where(head > PRICE_WINDOW, head % PRICE_WINDOW, 0)
+    dt = np.maximum(ring["t"][rows, newest] - ring["t"][rows, oldest], 1e-9)
+    price_velocity = (ring["p"][rows, newest] - ring["p"][rows, oldest]) / dt
+
+    # 成交量加速度（未写入的槽位为 0，整行求和即窗口内成交量）
+    v_total = ring["q"].sum(axis=1, dtype=np.float64)
+    v_avg = v_total / np.maximum(np.minimum(head, PRICE_WINDOW), 1)
+    volume_accel = np.divide(v_total, v_avg, out=np.zeros_like(v_total), where=v_avg > 0)
+
+    out = ring["features"]
+    out[:, 0] = price_velocity
+    out[:, 1] = volume_accel
+    out[:, 2] = ring["liq"].sum(axis=1, dtype=np.float64) / 1e6  # 清算热度
+
+
+def _feature_worker(shm_name: str, n: int, cadence: float, ready, stop):
+    """特征计算子进程：按 cadence 周期读取共享环形缓冲区并写回特征"""
+    shm = SharedMemory(name=shm_name)
+    ring = _ring_views(shm.buf, n)
+    try:
+        while not stop.wait(cadence):
+            _compute_features_into(ring)
+            ready.set()
+    finally:
+        ring = None  # 释放视图后才能关闭共享内存
+        shm.close()
+
+
 class DataIngestionManager:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
@@ -25,22 +104,30 @@ class DataIngestionManager:
         self.raw_data = {}
         self.features = {}
         self.stream_tasks = []
+        self._http = None  # 长连接 HTTP 会话，首次使用时创建（需在事件循环内）
 
         self.cadence = config["data_ingestion"]["cadence_seconds"]
         self.top_n = config["data_ingestion"]["top_symbols_tracking"]
         self.dynamic_selection = config["data_ingestion"]["dynamic_selection"]
 
-        self.ws_endpoints = {
-            "agg_trades": "wss://fstream.binance.com/ws/{symbol}@aggTrade",
-            "kline": "wss://fstream.binance.com/ws/{symbol}@kline_1m",
-            "orderbook": "wss://fstream.binance.com/ws/{symbol}@depth20@100ms",
-            "liquidations": "wss://fstream.binance.com/ws/{symbol}@forceOrder"
+        # 组合流：每类数据源只建一条连接，承载全部交易对的订阅
+        self.ws_combined_endpoint = "wss://fstream.binance.com/stream?streams="
+        self.ws_streams = {
+            "agg_trades": "{symbol}@aggTrade",
+            "kline": "{symbol}@kline_1m",
+            "orderbook": "{symbol}@depth20@100ms",
+            "liquidations": "{symbol}@forceOrder"
         }
+        self.ws_urls: Dict[str, str] = {}
+        self.stream_symbols: Dict[str, str] = {}  # 小写 stream 前缀 → 交易对
 
-        # 缓存队列：用于计算价格动量、成交量加速度等特征
-        self.price_cache = {}
-        self.volume_cache = {}
-        self.liquidation_cache = {}
+        # 共享内存环形缓冲区：用于计算价格动量、成交量加速度等特征（见 _ring_layout）
+        self._sym_idx: Dict[str, int] = {}
+        self._shm = None
+        self._ring: Dict[str, np.ndarray] = {}
+        self._feature_proc = None
+        self._features_ready = None
+        self._feature_stop = None
 
     async def start_stream(self):
         """
@@ -50,6 +137,7 @@ class DataIngestionManager:
         3. 定时数据清洗与特征提取
         """
         await self._refresh_top_symbols()
+        self._start_feature_worker()
 
         # 并行启动所有数据流
         self.stream_tasks = [
@@ -65,117 +153,173 @@ class DataIngestionManager:
     async def _refresh_top_symbols(self):
         """通过成交量+波动率+舆情动态获取Top N交易对"""
         logger.info("🔎 动态选择 Top%d 币种...", self.top_n)
-        async with aiohttp.ClientSession() as session:
-            async with session.get("https://fapi.binance.com/fapi/v1/ticker/24hr") as resp:
-                tickers = await resp.json()
-        ranked = sorted(
-            tickers,
-            key=lambda x: float(x["quoteVolume"]) * float(x["priceChangePercent"]),
-            reverse=True
+        async with self._get_http().get("https://fapi.binance.com/fapi/v1/ticker/24hr") as resp:
+            tickers = await resp.json()
+        # 只需前 top_n 个：堆选 O(M log N)，无需对全部交易对排序
+        candidates = (t for t in tickers if "USDT" in t["symbol"])
+        top = heapq.nlargest(
+            self.top_n,
+            candidates,
+            key=lambda x: float(x["quoteVolume"]) * float(x["priceChangePercent"])
         )
-        self.symbols = [t["symbol"] for t in ranked if "USDT" in t["symbol"]][:self.top_n]
+        self.symbols = [t["symbol"] for t in top]
         logger.info("✅ 已选中交易对: %s", self.symbols)
 
+        # 构建组合流 URL，如 .../stream?streams=btcusdt@aggTrade/ethusdt@aggTrade
+        self.stream_symbols = {s.lower(): s for s in self.symbols}
+        self.ws_urls = {
+            source: self.ws_combined_endpoint + "/".join(
+                stream.format(symbol=name) for name in self.stream_symbols
+            )
+            for source, stream in self.ws_streams.items()
+        }
+        self._sym_idx = {s: i for i, s in enumerate(self.symbols)}
+
+    def _get_http(self) -> aiohttp.ClientSession:
+        """复用同一 HTTP 会话：连接池 + keep-alive，避免每次请求重新握手 TLS"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300),
+                headers={"Accept-Encoding": "gzip"}
+            )
+        return self._http
+
+    def _start_feature_worker(self):
+        """分配共享内存并启动特征计算子进程"""
+        n = len(self.symbols)
+        self._shm = SharedMemory(create=True, size=max(_ring_nbytes(n), 1))
+        self._ring = _ring_views(self._shm.buf, n)
+        for arr in self._ring.values():
+            arr.fill(0)
+
+        ctx = mp.get_context("spawn")
+        self._features_ready = ctx.Event()
+        self._feature_stop = ctx.Event()
+        self._feature_proc = ctx.Process(
+            target=_feature_worker,
+            args=(self._shm.name, n, self.cadence, self._features_ready, self._feature_stop),
+            name="feature-worker",
+            daemon=True
+        )
+        self._feature_proc.start()
+
     async def _stream_ws(self, source: str):
-        """订阅指定WebSocket数据流"""
-        logger.info(f"📡 启动数据流: {source}")
-        while True:
-            try:
-                for symbol in self.symbols:
-                    url = self.ws_endpoints[source].format(symbol=symbol.lower())
-                    asyncio.create_task(self._connect_ws(url, source, symbol))
-                break
-            except Exception as e:
-                logger.error(f"❌ WS连接失败 [{source}]: {e}")
-                await asyncio.sleep(5)
+        """订阅指定WebSocket数据流（全部交易对复用一条组合流）"""
+        logger.info("📡 启动数据流: %s", source)
+        await self._connect_ws(self.ws_urls[source], source)
 
-    async def _connect_ws(self, url: str, source: str, symbol: str):
-        """连接单一WebSocket流"""
+    async def _connect_ws(self, url: str, source: str):
+        """连接单一组合WebSocket流"""
         while True:
             try:
-                async with websockets.connect(url, ping_interval=20) as ws:
-                    async for msg in ws:
-                        data = json.loads(msg)
-                        await self._handle_message(source, symbol, data)
+                # 关闭 permessage-deflate：行情 JSON 帧小而密，解压只会多一轮拷贝
+                async with websockets.connect(
+                    url,
+                    ping_interval=20,
+                    compression=None,
+                    max_size=2 ** 20,
+                    read_limit=2 ** 20
+                ) as ws:
+                    while True:
+                        # 阻塞等待首帧，再顺带取出接收队列中已就绪的帧，整批处理
+                        msgs = [await ws.recv()]
+                        while ws.messages:
+                            msgs.append(await ws.recv())
+                        await self._handle_batch(source, msgs)
             except Exception as e:
-                logger.warning(f"⚠️ WS断开 [{source} {symbol}]：{e}，重连中...")
+                logger.warning("⚠️ WS断开 [%s]：%s，重连中...", source, e)
                 await asyncio.sleep(3)
 
-    async def _handle_message(self, source: str, symbol: str, data: Dict[str, Any]):
-        """解析消息并缓存"""
-        ts = int(time.time() * 1000)
-        if symbol not in self.raw_data:
-            self.raw_data[symbol] = {}
-        if source not in self.raw_data[symbol]:
-            self.raw_data[symbol][source] = deque(maxlen=1000)
+    async def _handle_batch(self, source: str, msgs: List[Any]):
+        """批量解析组合流消息，按 stream 字段分发到各交易对缓存（同批次共用一个时间戳）"""
+        ts = time.time_ns() // 1_000_000
+        now = time.monotonic()  # 价格速度使用单调时钟，不受系统校时影响
+        batches: Dict[str, List[Dict[str, Any]]] = {}
+        for msg in msgs:
+            envelope = _json_loads(msg)
+            symbol = self.stream_symbols.get(envelope["stream"].partition("@")[0])
+            if symbol is not None:
+                batches.setdefault(symbol, []).append(envelope["data"])
+
+        for symbol, batch in batches.items():
+            source_cache = self.raw_data.setdefault(symbol, {})
+            if source not in source_cache:
+                source_cache[source] = deque(maxlen=1000)
 
-        self.raw_data[symbol][source].append({"t": ts, "data": data})
+            source_cache[source].extend([{"t": ts, "data": data} for data in batch])
 
-        # 针对不同数据类型，做即时缓存处理
-        if source == "agg_trades":
-            self._update_price_velocity(symbol, data)
-        elif source == "liquidations":
-            self._update_liquidation_impact(symbol, data)
+            # 针对不同数据类型，做即时缓存处理
+            if source == "agg_trades":
+                for data in batch:
+                    self._update_price_velocity(symbol, data, now)
+            elif source == "liquidations":
+                for data in batch:
+                    self._update_liquidation_impact(symbol, data)
 
-    def _update_price_velocity(self, symbol: str, data: Dict[str, Any]):
+    def _update_price_velocity(self, symbol: str, data: Dict[str, Any], now: float):
         """计算价格速度（Δp/Δt）和成交量加速度"""
         price = float(data["p"])
         qty = float(data["q"])
-        now = time.time()
 
-        if symbol not in self.price_cache:
-            self.price_cache[symbol] = deque(maxlen=50)
-        if symbol not in self.volume_cache:
-            self.volume_cache[symbol] = deque(maxlen=50)
-
-        self.price_cache[symbol].append((now, price))
-        self.volume_cache[symbol].append((now, qty))
+        ring = self._ring
+        i = self._sym_idx[symbol]
+        j = ring["head"][i] % PRICE_WINDOW
+        ring["t"][i, j] = now
+        ring["p"][i, j] = price
+        ring["q"][i, j] = qty
+        ring["head"][i] += 1  # 最后推进写指针，子进程读到的样本总是完整的
 
     def _update_liquidation_impact(self, symbol: str, data: Dict[str, Any]):
         """记录大额清算事件"""
         notional = float(data["o"]["p"]) * float(data["o"]["q"])
-        if symbol not in self.liquidation_cache:
-            self.liquidation_cache[symbol] = deque(maxlen=100)
-        self.liquidation_cache[symbol].append(notional)
+        ring = self._ring
+        i = self._sym_idx[symbol]
+        ring["liq"][i, ring["liq_head"][i] % LIQ_WINDOW] = notional
+        ring["liq_head"][i] += 1
 
     async def _periodic_feature_engineering(self):
-        """周期性进行特征提取"""
+        """周期性收取特征进程的结果（特征计算不占用事件循环）"""
         while True:
-            await asyncio.sleep(self.cadence)
+            ready = await asyncio.to_thread(self._features_ready.wait, self.cadence * 2)
+            if not ready:
+                logger.warning("⚠️ 特征进程未按时返回结果")
+                continue
+            self._features_ready.clear()
             try:
                 self.features = self._compute_features()
                 logger.info("📊 特征计算完成: %d 个交易对", len(self.features))
             except Exception as e:
-                logger.error(f"❌ 特征计算失败: {e}")
+                logger.error("❌ 特征计算失败: %s", e)
 
     def _compute_features(self) -> Dict[str, Any]:
-        """从缓存数据计算高阶特征"""
+        """读取特征进程写回的高阶特征（仅保留至少 5 笔成交的交易对）"""
         features = {}
-        for symbol in self.symbols:
-            if symbol not in self.price_cache or len(self.price_cache[symbol]) < 5:
+        rows = zip(self.symbols, self._ring["head"].tolist(), self._ring["features"].tolist())
+        for symbol, n, (price_velocity, volume_accel, liq_heat) in rows:
+            if n < 5:
                 continue
-
-            # 价格动量
-            t0, p0 = self.price_cache[symbol][0]
-            t1, p1 = self.price_cache[symbol][-1]
-            price_velocity = (p1 - p0) / max(t1 - t0, 1e-9)
-
-            # 成交量加速度
-            v_total = sum(q for _, q in self.volume_cache[symbol])
-            v_avg = v_total / max(len(self.volume_cache[symbol]), 1)
-            volume_accel = v_total / v_avg if v_avg > 0 else 0
-
-            # 清算热度
-            liq_heat = sum(self.liquidation_cache.get(symbol, [])) / 1e6
-
             features[symbol] = {
                 "price_velocity": price_velocity,
                 "volume_acceleration": volume_accel,
                 "liquidation_heat": liq_heat
             }
-
         return features
 
+    async def close(self):
+        """关闭 HTTP 会话，停止特征进程并释放共享内存"""
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+        if self._feature_proc is not None:
+            self._feature_stop.set()
+            await asyncio.to_thread(self._feature_proc.join, 5)
+            self._feature_proc = None
+        if self._shm is not None:
+            self._ring = {}
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
     def get_features(self) -> Dict[str, Any]:
         """外部调用接口：返回实时特征"""
         return self.features
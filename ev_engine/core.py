@@ -6,14 +6,38 @@ CALDROS-GTO V19 | ev_engine/core.py
 EV 引擎：贝叶斯胜率估计 + 动态 G/L 调整 + 风报比优化 + 多层决策引擎
 """
 
+import math
+import random
 import numpy as np
 import logging
-from typing import Dict, Any, Tuple
-from scipy.stats import beta
+from collections import deque
+from typing import Dict, Any, List, Tuple
 
 logger = logging.getLogger("EVEngine")
 
 
+# === 纯函数：标量与 ndarray 通用，供单币种与批量路径共用 ===
+def _gain(atr, momentum, liquidity):
+    """收益潜力基准：波动率 + 动量 + 流动性乘数"""
+    return np.clip(1 + 3 * atr * momentum * liquidity, 0.5, 5.0)
+
+
+def _loss(vol, depth, slippage):
+    """损失函数：波动越大、深度越低、滑点越高 → L 越大"""
+    return np.clip(1 + 2 * vol * (1 / depth) + slippage * 10, 0.5, 5.0)
+
+
+def _fees(funding_rate, slippage):
+    """基础手续费 + 资金费率成本 + 滑点惩罚"""
+    return 0.0016 + np.abs(funding_rate) * 10 + slippage * 2
+
+
+def _kelly(p, G, L):
+    """Kelly 仓位比例，限制最大仓位为总资产的25%"""
+    b = G / np.where(L != 0, L, G)  # L 为 0 时 b 取 1
+    return np.clip((p * (b + 1) - 1) / b, 0.0, 0.25)
+
+
 class EVEngine:
     def __init__(self, config: Dict[str, Any], signal_engine):
         """
@@ -25,7 +49,19 @@ class EVEngine:
         self.beta_prior = config["ev_engine"]["estimation"]["beta_prior"]
         self.base_threshold = config["ev_engine"]["dynamic_thresholds"]["base_threshold"]
         self.trade_window = config["ev_engine"]["estimation"]["window_trades"]
-        self.history = []  # 用于后验胜率更新和再训练
+        self.history = deque(maxlen=self.trade_window)  # 用于后验胜率更新和再训练
+        self.history_by_symbol = {}  # {symbol: {"win": n, "loss": n}}，与 history 窗口同步增量维护
+
+        # EV 分层阈值（升序）及对应层级 / 杠杆区间，searchsorted 一次查表
+        self._ev_bins = np.array([-0.02, 0.03, 0.10, 0.20, 0.35])
+        self._tier_names = np.array(
+            ["T6_defensive", "T5_scalping", "T4_neutral", "T3_moderate", "T2_strong", "T1_explosive"],
+            dtype=object
+        )
+        self._lev_low = np.array([1, 5, 10, 20, 50, 90])
+        self._lev_high = np.array([5, 15, 30, 50, 85, 120])
+        # 标量路径使用的闭区间 (low, high)，直接交给 random.randint
+        self._lev_ranges = tuple(zip(self._lev_low.tolist(), (self._lev_high - 1).tolist()))
 
     def calculate_ev_for_symbol(self, symbol: str, market_state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -34,11 +70,11 @@ class EVEngine:
         :param market_state: 市场特征（波动率、成交量、深度、结构等）
         """
         signal_data = self.signal_engine.get_signal(symbol)
-        if not signal_data:
+        if signal_data is None:
             return {}
 
-        score = signal_data["signal_score"]
-        components = signal_data["components"]
+        score = signal_data.score
+        components = signal_data.components
 
         # === 胜率估计 p ===
         p = self._estimate_probability(symbol, score, market_state)
@@ -53,8 +89,8 @@ class EVEngine:
         ev = p * G - (1 - p) * L - self._estimate_fees(market_state)
 
         # === 分层与策略决策 ===
-        tier = self._classify_ev(ev)
-        optimal_leverage = self._recommend_leverage(ev)
+        tier_idx, tier = self._classify_ev(ev)
+        optimal_leverage = self._recommend_leverage(tier_idx)
         position_size = self._dynamic_kelly(p, G, L)
 
         # === 存储历史，用于自学习 ===
@@ -72,13 +108,76 @@ class EVEngine:
             "components": components
         }
 
+    def calculate_ev_batch(self, symbols: List[str], states: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批量计算多个币种的 EV（calculate_ev_for_symbol 的向量化版本）
+        :param symbols: 币种名称列表
+        :param states: 与 symbols 一一对应的市场特征
+        :return: 有信号币种的结果列表，字段与 calculate_ev_for_symbol 一致
+        """
+        signals = [self.signal_engine.get_signal(symbol) for symbol in symbols]
+        keep = [i for i, signal_data in enumerate(signals) if signal_data is not None]
+        if not keep:
+            return []
+        symbols = [symbols[i] for i in keep]
+        states = [states[i] for i in keep]
+        signals = [signals[i] for i in keep]
+        n = len(symbols)
+
+        def column(key: str, default: float) -> np.ndarray:
+            return np.fromiter((state.get(key, default) for state in states), dtype=np.float64, count=n)
+
+        score = np.fromiter((s.score for s in signals), dtype=np.float64, count=n)
+        counts = [self.history_by_symbol.get(symbol) for symbol in symbols]
+        wins = np.fromiter((c["win"] if c else 0 for c in counts), dtype=np.float64, count=n)
+        losses = np.fromiter((c["loss"] if c else 0 for c in counts), dtype=np.float64, count=n)
+        slippage = column("slippage", 0.01)
+
+        # === 胜率估计 p（Beta 后验均值 + 市场修正）===
+        α0, β0 = self.beta_prior["alpha"], self.beta_prior["beta"]
+        α_post = α0 + wins + score * 10
+        β_post = β0 + losses + (1 - score) * 10
+        p = α_post / (α_post + β_post)
+        p *= np.exp(-column("volatility", 0.5)) * (1 + 0.15 * column("trend_consistency", 0.0))
+        p = np.clip(p, 0.01, 0.99)
+
+        # === G / L / EV ===
+        G = _gain(column("ATR", 0.01), column("momentum", 1.0), column("liquidity_score", 1.0))
+        L = _loss(column("volatility", 1.0), column("depth_score", 1.0), slippage)
+        ev = p * G - (1 - p) * L - _fees(column("funding_rate", 0.0), slippage)
+
+        # === 分层与策略决策 ===
+        tier_idx = self._ev_bins.searchsorted(ev, side="right")
+        tiers = self._tier_names[tier_idx]
+        leverage = np.random.randint(self._lev_low[tier_idx], self._lev_high[tier_idx])
+        kelly = _kelly(p, G, L)
+
+        # 仅在此处逐币种落地：记录历史并组装结果
+        results = []
+        for i, (symbol, p_i, G_i, L_i, ev_i, lev_i, kelly_i) in enumerate(zip(
+                symbols, p.tolist(), G.tolist(), L.tolist(), ev.tolist(), leverage.tolist(), kelly.tolist())):
+            self._record_history(symbol, p_i, G_i, L_i, ev_i, tiers[i])
+            results.append({
+                "symbol": symbol,
+                "p_win": p_i,
+                "G": G_i,
+                "L": L_i,
+                "EV": ev_i,
+                "tier": tiers[i],
+                "kelly_position": kelly_i,
+                "recommended_leverage": lev_i,
+                "components": signals[i].components
+            })
+        return results
+
     def _estimate_probability(self, symbol: str, score: float, state: Dict[str, Any]) -> float:
         """
         胜率估计（贝叶斯 + 强化学习修正）
         """
         α0, β0 = self.beta_prior["alpha"], self.beta_prior["beta"]
-        past_wins = sum(1 for t in self.history if t["symbol"] == symbol and t["win"])
-        past_losses = sum(1 for t in self.history if t["symbol"] == symbol and not t["win"])
+        counts = self.history_by_symbol.get(symbol)
+        past_wins = counts["win"] if counts else 0
+        past_losses = counts["loss"] if counts else 0
 
         α_post = α0 + past_wins + (score * 10)
         β_post = β0 + past_losses + (1 - score) * 10
@@ -87,11 +186,11 @@ class EVEngine:
         p = α_post / (α_post + β_post)
 
         # 加入市场修正：波动率高时降低信心，趋势一致时提升信心
-        vol_penalty = np.exp(-state.get("volatility", 0.5))
+        vol_penalty = math.exp(-state.get("volatility", 0.5))
         trend_boost = 1 + 0.15 * state.get("trend_consistency", 0.0)
         p *= vol_penalty * trend_boost
 
-        return np.clip(p, 0.01, 0.99)
+        return min(max(p, 0.01), 0.99)
 
     def _estimate_gain(self, state: Dict[str, Any]) -> float:
         """
@@ -100,10 +199,7 @@ class EVEngine:
         atr = state.get("ATR", 0.01)
         momentum = state.get("momentum", 1.0)
         liquidity = state.get("liquidity_score", 1.0)
-
-        # 收益潜力基准：波动率 + 动量 + 流动性乘数
-        G = 1 + 3 * atr * momentum * liquidity
-        return np.clip(G, 0.5, 5.0)
+        return _gain(atr, momentum, liquidity)
 
     def _estimate_loss(self, state: Dict[str, Any]) -> float:
         """
@@ -112,68 +208,43 @@ class EVEngine:
         vol = state.get("volatility", 1.0)
         depth = state.get("depth_score", 1.0)
         slippage = state.get("slippage", 0.01)
-
-        # 损失函数：波动越大、深度越低、滑点越高 → L 越大
-        L = 1 + 2 * vol * (1 / depth) + slippage * 10
-        return np.clip(L, 0.5, 5.0)
+        return _loss(vol, depth, slippage)
 
     def _estimate_fees(self, state: Dict[str, Any]) -> float:
         """
         费用估计：基础手续费 + 资金费率成本 + 滑点惩罚
         """
-        base_fee = 0.0016
-        funding = abs(state.get("funding_rate", 0.0)) * 10
-        slippage_cost = state.get("slippage", 0.01) * 2
-
-        return base_fee + funding + slippage_cost
-
-    def _classify_ev(self, ev: float) -> str:
-        """
-        EV 分层决策
-        """
-        if ev >= 0.35:
-            return "T1_explosive"
-        elif ev >= 0.20:
-            return "T2_strong"
-        elif ev >= 0.10:
-            return "T3_moderate"
-        elif ev >= 0.03:
-            return "T4_neutral"
-        elif ev >= -0.02:
-            return "T5_scalping"
-        else:
-            return "T6_defensive"
-
-    def _recommend_leverage(self, ev: float) -> int:
-        """
-        根据信号 EV 推荐杠杆区间
-        """
-        if ev >= 0.35:
-            return np.random.randint(90, 120)
-        elif ev >= 0.20:
-            return np.random.randint(50, 85)
-        elif ev >= 0.10:
-            return np.random.randint(20, 50)
-        elif ev >= 0.03:
-            return np.random.randint(10, 30)
-        elif ev >= -0.02:
-            return np.random.randint(5, 15)
-        else:
-            return np.random.randint(1, 5)
+        return _fees(state.get("funding_rate", 0.0), state.get("slippage", 0.01))
+
+    def _classify_ev(self, ev: float) -> Tuple[int, str]:
+        """
+        EV 分层决策：返回 (层级索引, 层级名称)，索引供杠杆查表复用
+        """
+        tier_idx = int(self._ev_bins.searchsorted(ev, side="right"))
+        return tier_idx, self._tier_names[tier_idx]
+
+    def _recommend_leverage(self, tier_idx: int) -> int:
+        """
+        根据 EV 层级推荐杠杆区间
+        """
+        return random.randint(*self._lev_ranges[tier_idx])
 
     def _dynamic_kelly(self, p: float, G: float, L: float) -> float:
         """
         动态 Kelly 仓位控制：考虑波动性和信号置信度
         """
-        edge = (p * (G + 1)) - (1 - p) * L
-        b = G / L if L != 0 else 1
-        kelly_fraction = (p * (b + 1) - 1) / b
-        return np.clip(kelly_fraction, 0.0, 0.25)  # 限制最大仓位为总资产的25%
+        return _kelly(p, G, L)
 
     def _record_history(self, symbol: str, p: float, G: float, L: float, ev: float, tier: str):
         """
         保存交易结果到历史数据库，用于 AI 强化学习 & 胜率校准
         """
+        # deque 满时 append 会挤出最旧记录，先同步扣减其计数
+        if len(self.history) == self.history.maxlen:
+            evicted = self.history[0]
+            self.history_by_symbol[evicted["symbol"]]["win" if evicted["win"] else "loss"] -= 1
+
+        win = ev > 0
         self.history.append({
             "symbol": symbol,
             "p": p,
@@ -181,7 +252,7 @@ class EVEngine:
             "L": L,
             "EV": ev,
             "tier": tier,
-            "win": ev > 0
+            "win": win
         })
-        if len(self.history) > self.trade_window:
-            self.history.pop(0)
+        counts = self.history_by_symbol.setdefault(symbol, {"win": 0, "loss": 0})
+        counts["win" if win else "loss"] += 1
@@ -13,6 +13,8 @@ import numpy as np
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 
+from caldros_gto.common.timefmt import iso_utc
+
 logger = logging.getLogger("ExecutionEngine")
 
 class ExecutionEngine:
@@ -30,7 +32,7 @@ class ExecutionEngine:
         self.risk_manager = risk_manager
         self.config = config
         self.active_positions = {}
-        self.cooldowns = {}
+        self.cooldowns = {}  # {symbol: 冷却结束时刻（time.monotonic 秒）}
         self.trade_log = []
 
     # === 入口：执行一轮交易决策 ===
@@ -38,29 +40,34 @@ class ExecutionEngine:
         """
         每次信号刷新时调用，执行下单/退出/轮换
         """
-        for symbol, state in market_snapshot.items():
-            ev_result = self.ev_engine.calculate_ev_for_symbol(symbol, state)
-            if not ev_result:
-                continue
-
+        # 一次性批量计算全部币种 EV，循环内只处理下单等副作用
+        symbols = list(market_snapshot)
+        ev_results = self.ev_engine.calculate_ev_batch(symbols, [market_snapshot[s] for s in symbols])
+        base_threshold = self.config["ev_engine"]["dynamic_thresholds"]["base_threshold"]
+        now = time.monotonic()
+        # 风控整批检查一次（断路器/回撤/保证金只读一次），得到逐币种开仓放行掩码；
+        # 掩码只约束新开仓，退出管理不受风控拦截（去风险时仍需能平仓）
+        evs = np.fromiter((r["EV"] for r in ev_results), dtype=np.float64, count=len(ev_results))
+        risk_ok = self.risk_manager.pre_trade_check_batch(evs).tolist()
+
+        for ev_result, allowed in zip(ev_results, risk_ok):
+            symbol = ev_result["symbol"]
             ev = ev_result["EV"]
             tier = ev_result["tier"]
             leverage = ev_result["recommended_leverage"]
             position_size = ev_result["kelly_position"]
 
-            # 检查风控与冷却
-            if not self._check_risk(symbol, ev):
-                continue
-            if self._in_cooldown(symbol):
+            # 检查冷却
+            if self._in_cooldown(symbol, now):
                 continue
 
-            # 有仓位 → 判断是否需要退出或轮换
+            # 有仓位 → 判断是否需要退出或轮换（轮换含重新开仓，需风控放行）
             if symbol in self.active_positions:
                 self._maybe_exit(symbol, ev_result)
-                self._maybe_rotate(symbol, ev_result)
+                self._maybe_rotate(symbol, ev_result, allowed)
             else:
                 # 无仓位 → 决定是否建仓
-                if ev > self.config["ev_engine"]["dynamic_thresholds"]["base_threshold"]:
+                if allowed and ev > base_threshold:
                     self._enter_position(symbol, ev_result, leverage, position_size)
 
     # === 建仓 ===
@@ -71,7 +78,7 @@ class ExecutionEngine:
         balance = self.accounting.get_available_balance()
         order_notional = balance * position_size * leverage
 
-        logger.info(f"[ENTRY] {symbol} | EV: {ev_result['EV']:.3f} | Size: {order_notional:.2f} | Lev: {leverage}x")
+        logger.info("[ENTRY] %s | EV: %.3f | Size: %.2f | Lev: %sx", symbol, ev_result["EV"], order_notional, leverage)
 
         order = self._mock_order(
             symbol=symbol,
@@ -82,7 +89,7 @@ class ExecutionEngine:
 
         self.active_positions[symbol] = {
             "entry_time": datetime.utcnow(),
-            "entry_price": ev_result["components"].get("price", 0),
+            "entry_price": (ev_result["components"] or {}).get("price", 0),
             "leverage": leverage,
             "notional": order_notional,
             "ev_entry": ev_result["EV"],
@@ -119,10 +126,13 @@ class ExecutionEngine:
             self._exit_position(symbol, reason="EV decayed")
 
     # === 仓位轮换 ===
-    def _maybe_rotate(self, symbol: str, ev_result: Dict[str, Any]):
+    def _maybe_rotate(self, symbol: str, ev_result: Dict[str, Any], allowed: bool = True):
         """
         如果有更高 EV 的仓位 → 自动轮换
+        :param allowed: 本轮风控是否放行新开仓；不放行时不轮换
         """
+        if not allowed:
+            return
         pos = self.active_positions[symbol]
         current_ev = ev_result["EV"]
         if current_ev < ev_result["ev_entry"]:
@@ -143,29 +153,16 @@ class ExecutionEngine:
         if not pos:
             return
 
-        logger.info(f"[EXIT] {symbol} | Reason: {reason}")
-        self.cooldowns[symbol] = datetime.utcnow() + timedelta(minutes=5)
-
-    # === 检查风险 ===
-    def _check_risk(self, symbol: str, ev: float) -> bool:
-        """
-        检查风险指标是否允许交易
-        """
-        if self.risk_manager.check_circuit_breaker():
-            logger.warning("[RISK] Circuit breaker active, trading paused.")
-            return False
-        if ev < -0.05:
-            logger.warning(f"[RISK] Negative EV detected for {symbol}, skipping.")
-            return False
-        return True
+        logger.info("[EXIT] %s | Reason: %s", symbol, reason)
+        self.cooldowns[symbol] = time.monotonic() + 300.0  # 冷却 5 分钟
 
-    def _in_cooldown(self, symbol: str) -> bool:
+    # === 检查冷却 ===
+    def _in_cooldown(self, symbol: str, now: float) -> bool:
         """
-        检查冷却时间
+        检查币种是否处于平仓后的冷却期
+        :param now: 本轮 execute_cycle 开始时的 time.monotonic()
         """
-        if symbol in self.cooldowns and datetime.utcnow() < self.cooldowns[symbol]:
-            return True
-        return False
+        return self.cooldowns.get(symbol, 0.0) > now
 
     def _position_profitable(self, symbol: str) -> bool:
         """
@@ -183,5 +180,5 @@ class ExecutionEngine:
             "side": side,
             "size": size,
             "leverage": leverage,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": iso_utc()
         }
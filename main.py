@@ -8,9 +8,18 @@ CALDROS-GTO V19 | main.py
 
 import asyncio
 import logging
+import logging.handlers
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
 import uvicorn
 from fastapi import FastAPI
 
+try:
+    import uvloop
+except ImportError:  # Windows 等平台无 uvloop，回退默认事件循环
+    uvloop = None
+
+from caldros_gto.common.logs import start_periodic_flush
 from caldros_gto.configs.loader import load_config
 from caldros_gto.data_ingestion.manager import DataIngestionManager
 from caldros_gto.signal_engine.core import SignalEngine
@@ -18,15 +27,18 @@ from caldros_gto.ev_engine.core import EVEngine
 from caldros_gto.execution_system.executor import ExecutionSystem
 from caldros_gto.risk_management.manager import RiskManager
 from caldros_gto.ai_adaptation.trainer import AIAdaptation
+from caldros_gto.ai_adaptation.meta_loop import MetaLearningLoop
 from caldros_gto.ops_monitor.monitor import OpsMonitor
 from caldros_gto.backtesting.runner import Backtester
 from caldros_gto.simulation.stress import StressTester
 
 # === 日志配置 ===
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+# INFO 行先缓存，满 1000 条或出现 WARNING 时批量写出；另每 5 秒定时刷新，低流量时不滞留
+_log_buffer = logging.handlers.MemoryHandler(capacity=1000, flushLevel=logging.WARNING, target=_log_stream)
+start_periodic_flush(_log_buffer, interval=5.0)
+logging.basicConfig(level=logging.INFO, handlers=[_log_buffer])
 logger = logging.getLogger("CALDROS-GTO")
 
 # === FastAPI 初始化 ===
@@ -56,7 +68,10 @@ async def startup_event():
     components["execution_system"] = ExecutionSystem(config)
     components["risk_manager"] = RiskManager(config)
     components["ai_adaptation"] = AIAdaptation(config)
-    components["ops_monitor"] = OpsMonitor(config)
+    # spawn：此时进程已有 Numba/计算/日志等线程，fork 可能复制持有中的锁导致子进程死锁
+    components["process_pool"] = ProcessPoolExecutor(max_workers=2, mp_context=mp.get_context("spawn"))
+    components["meta_loop"] = MetaLearningLoop(config, executor=components["process_pool"])
+    components["ops_monitor"] = OpsMonitor(config, risk_manager=components["risk_manager"])
     components["backtester"] = Backtester(config)
     components["stress_tester"] = StressTester(config)
 
@@ -80,13 +95,27 @@ async def startup_event():
     # AI 自适应调优
     logger.info("🧠 启动 AI 自进化模块...")
     asyncio.create_task(components["ai_adaptation"].start_learning_loop())
+    asyncio.create_task(components["meta_loop"].run())
 
     # 运维监控
     logger.info("📊 启动监控模块...")
+    await components["ops_monitor"].start_alerter()
     asyncio.create_task(components["ops_monitor"].start_metrics_loop())
 
     logger.info("✅ 系统初始化完成，实盘交易已准备就绪。")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """关闭时停止自进化循环、回收进程池，关闭告警通道与数据采集资源（HTTP 会话/特征进程/共享内存）"""
+    if "meta_loop" in components:
+        components["meta_loop"].stop()
+    if "process_pool" in components:
+        components["process_pool"].shutdown(wait=False, cancel_futures=True)
+    if "ops_monitor" in components:
+        await components["ops_monitor"].close()
+    if "data_ingestion" in components:
+        await components["data_ingestion"].close()
+
 @app.get("/")
 async def root():
     return {"status": "running", "version": "V19", "message": "CALDROS-GTO ready."}
@@ -106,4 +135,7 @@ async def run_stress_test():
     return {"status": "completed", "result": result}
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8080)
+    # uvloop 事件循环：提升 WebSocket 行情流吞吐
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    uvicorn.run(app, host="0.0.0.0", port=8080, loop="uvloop" if uvloop is not None else "asyncio")
@@ -7,25 +7,151 @@ CALDROS-GTO V19 | ops_monitor/monitor.py
 """
 
 import time
+import asyncio
 import logging
-import requests
-from datetime import datetime
-from typing import Dict, Any
+import operator
+import threading
+import aiohttp
+from typing import Dict, Any, Optional
+
+from caldros_gto.common.logs import RateLimitFilter
+from caldros_gto.common.timefmt import iso_utc
 
 logger = logging.getLogger("OpsMonitor")
+# 逐指标高频日志单独限流（不影响告警/自愈等其他日志）
+metrics_logger = logging.getLogger("OpsMonitor.metrics")
+metrics_logger.addFilter(RateLimitFilter())
+
+
+class AsyncAlerter:
+    """
+    异步 Slack 告警：enqueue 非阻塞入队（可跨线程调用），后台协程复用同一 aiohttp 会话推送；
+    同一 key 的告警在 dedup_sec 秒内只发送一次。
+    未在外部事件循环中 start() 时（如 Deployer 同步调用 run_monitor_loop），首次入队会在守护线程中拉起私有循环
+    """
+
+    def __init__(self, url: str, dedup_sec: float = 60.0, maxsize: int = 1000):
+        self.url = url
+        self.dedup_sec = dedup_sec
+        self.maxsize = maxsize
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_sent: Dict[str, float] = {}
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+    async def start(self):
+        """在事件循环内启动：创建会话、队列与后台推送任务"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=3))
+        self._task = asyncio.create_task(self._drain())
+
+    def _start_private_loop(self):
+        """在守护线程中运行私有事件循环并完成 start()"""
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="alerter-loop", daemon=True).start()
+            asyncio.run_coroutine_threadsafe(self.start(), loop).result(timeout=5)
+
+    def enqueue(self, message: str, key: Optional[str] = None) -> bool:
+        """非阻塞入队（线程安全）；无法入队时记录告警并返回 False"""
+        if self._loop is None and not self._closed:
+            try:
+                self._start_private_loop()
+            except Exception as e:
+                logger.warning("[ALERT] 告警通道启动失败，未推送: %s (%s)", message, e)
+                return False
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            logger.warning("[ALERT] 告警通道已关闭，未推送: %s", message)
+            return False
+        try:
+            loop.call_soon_threadsafe(self._put, message, key or message)
+        except RuntimeError as e:  # 循环已关闭
+            logger.warning("[ALERT] 告警通道不可用，未推送: %s (%s)", message, e)
+            return False
+        return True
+
+    def _put(self, message: str, key: str):
+        """在事件循环线程内执行：去重后放入队列，队列满时丢弃"""
+        now = time.monotonic()
+        last = self._last_sent.get(key)
+        if last is not None and now - last < self.dedup_sec:
+            return
+        if len(self._last_sent) >= self.maxsize:  # 清理过期去重记录，防止无限增长
+            self._last_sent = {k: t for k, t in self._last_sent.items() if now - t < self.dedup_sec}
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.error("[ALERT] 告警队列已满，丢弃: %s", message)
+            return
+        self._last_sent[key] = now  # 入队成功才计入去重窗口，被丢弃的告警不会屏蔽后续同 key 告警
+
+    async def _drain(self):
+        while True:
+            message = await self._queue.get()
+            try:
+                async with self._session.post(self.url, json={"text": message}) as resp:
+                    if resp.status >= 400:
+                        logger.error("[ALERT] Slack 推送失败: HTTP %d", resp.status)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error("[ALERT] Slack 推送失败: %s", e)
+            except Exception:  # 其他异常不能终止推送任务，否则后续告警只入队不发送
+                logger.exception("[ALERT] Slack 推送异常")
+
+    async def close(self):
+        """停止后台任务并关闭 HTTP 会话"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self._closed = True
+        self._loop = None
+
 
 class OpsMonitor:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], risk_manager=None):
+        """
+        :param config: production.json 配置
+        :param risk_manager: 可选 RiskManager，自动修复配置后通知其重载缓存阈值
+        """
         self.config = config
+        self.risk_manager = risk_manager
         self.metrics = {}
         self.alert_thresholds = config.get("ops_monitor", {}).get("critical_thresholds", {})
         self.alert_channels = config.get("ops_monitor", {}).get("alerting", {}).get("channels", ["slack"])
         self.alert_url = config.get("SLACK_WEBHOOK", None)
+        self._rebuild_thresholds()
+
+        # 告警异步推送：监控循环只负责入队，不等待 Slack 往返
+        self._alerter = AsyncAlerter(self.alert_url) if "slack" in self.alert_channels and self.alert_url else None
+        self._stop = threading.Event()
+
+    def _rebuild_thresholds(self):
+        """预解析阈值字符串（如 "< 0.6"）为 {metric: (比较函数, 阈值)}，配置变更后需重新调用"""
+        ops = {"<": operator.lt, ">": operator.gt}
+        self._threshold_fns = {}
+        for metric, threshold in self.alert_thresholds.items():
+            op = ops.get(threshold[:1])
+            if op is not None:
+                self._threshold_fns[metric] = (op, float(threshold[1:]))
 
     # === 1️⃣ 实时指标更新 ===
     def update_metric(self, name: str, value: float):
         self.metrics[name] = value
-        logger.info(f"[Metrics] {name} = {value}")
+        if metrics_logger.isEnabledFor(logging.INFO):
+            metrics_logger.info("[Metrics] %s = %s", name, value)
 
     # === 2️⃣ 运行健康检测 ===
     def check_health(self) -> Dict[str, Any]:
@@ -34,29 +160,39 @@ class OpsMonitor:
             threshold = self.alert_thresholds.get(metric)
             if threshold is None:
                 continue
-            violated = self._evaluate_threshold(value, threshold)
+            violated = self._evaluate_threshold(metric, value)
             report[metric] = {"value": value, "threshold": threshold, "status": "ALERT" if violated else "OK"}
         return report
 
-    def _evaluate_threshold(self, value: float, threshold: str) -> bool:
-        """比较指标和阈值"""
-        if threshold.startswith("<"):
-            return value < float(threshold[1:])
-        if threshold.startswith(">"):
-            return value > float(threshold[1:])
-        return False
+    def _evaluate_threshold(self, metric: str, value: float) -> bool:
+        """比较指标和阈值（查预解析表，无法解析的阈值视为未触发）"""
+        entry = self._threshold_fns.get(metric)
+        if entry is None:
+            return False
+        op, limit = entry
+        return op(value, limit)
 
     # === 3️⃣ 异常自动告警 ===
-    def send_alert(self, message: str):
-        logger.warning(f"[ALERT] {message}")
-        if "slack" in self.alert_channels and self.alert_url:
-            requests.post(self.alert_url, json={"text": message})
+    async def start_alerter(self):
+        """在事件循环内启动异步告警通道（未配置 Slack 时为空操作）"""
+        if self._alerter is not None:
+            await self._alerter.start()
+
+    async def close(self):
+        if self._alerter is not None:
+            await self._alerter.close()
+
+    def send_alert(self, message: str, key: Optional[str] = None):
+        """记录告警并非阻塞地推送到 Slack；key 相同的告警 60 秒内只推送一次"""
+        logger.warning("[ALERT] %s", message)
+        if self._alerter is not None:
+            self._alerter.enqueue(message, key)
 
     def monitor_and_alert(self):
         report = self.check_health()
         for metric, r in report.items():
             if r["status"] == "ALERT":
-                self.send_alert(f"⚠️ {metric} 超过阈值！当前值：{r['value']} | 阈值：{r['threshold']}")
+                self.send_alert(f"⚠️ {metric} 超过阈值！当前值：{r['value']} | 阈值：{r['threshold']}", key=metric)
 
     # === 4️⃣ 自我修复机制 ===
     def self_heal(self):
@@ -74,14 +210,14 @@ class OpsMonitor:
                 break
 
     def _restart_service(self, reason: str):
-        logger.warning(f"[Self-Heal] Restarting modules due to abnormal: {reason}")
+        logger.warning("[Self-Heal] Restarting modules due to abnormal: %s", reason)
         # 在实际部署中，可调用 docker restart 或 Kubernetes API：
         # os.system("docker restart caldros_gto_core")
 
     # === 5️⃣ 定期生成报告 ===
     def generate_daily_report(self) -> Dict[str, Any]:
         report = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": iso_utc(),
             "PnL": self.metrics.get("pnl", 0.0),
             "Sharpe": self.metrics.get("sharpe_ratio", 0.0),
             "EV_accuracy": self.metrics.get("EV_accuracy", 0.0),
@@ -97,11 +233,29 @@ class OpsMonitor:
         if self.metrics.get("alpha_decay_rate", 0) > 0.3:
             logger.info("[AutoPatch] Alpha decay too high. Lowering EV threshold.")
             self.config["ev_engine"]["dynamic_thresholds"]["base_threshold"] *= 0.9
+            self._on_config_patched()
+
+    def _on_config_patched(self):
+        """配置被修改后调用：重建本模块阈值表，并通知 RiskManager 重载缓存阈值（未修改时无需调用）"""
+        self._rebuild_thresholds()
+        if self.risk_manager is not None:
+            self.risk_manager.reload_config()
 
     # === 7️⃣ 主循环 ===
     def run_monitor_loop(self, interval_sec: int = 60):
-        while True:
+        """按固定周期执行（以单调时钟对齐截止时间，不受单轮耗时影响），stop() 可立即退出"""
+        next_t = time.monotonic()
+        while not self._stop.is_set():
             self.monitor_and_alert()
             self.self_heal()
             self.auto_patch_config()
-            time.sleep(interval_sec)
+
+            next_t += interval_sec
+            now = time.monotonic()
+            if next_t < now:  # 单轮耗时超过周期：跳过错过的轮次，不补跑
+                next_t = now
+            self._stop.wait(next_t - now)
+
+    def stop(self):
+        """请求退出监控主循环"""
+        self._stop.set()
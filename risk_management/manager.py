@@ -6,9 +6,12 @@ CALDROS-GTO V19 | risk_management/manager.py
 风险管理系统：断路器、回撤控制、动态止损、对冲与自愈
 """
 
+import time
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Any
+import numpy as np
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Optional
 
 logger = logging.getLogger("RiskManager")
 
@@ -21,32 +24,57 @@ class RiskManager:
         """
         self.accounting = accounting
         self.config = config
-        self.drawdown_history = []
+        # 最近 10 笔亏损的环形缓冲 + 运行和，_risk_heat 为 O(1)
+        self._dd = np.zeros(10, dtype=np.float32)
+        self._dd_i = 0
+        self._dd_n = 0
+        self._dd_sum = 0.0
         self.loss_streak = 0
         self.circuit_breaker_active = False
-        self.last_trigger_time = None
+        self.last_trigger_time = None  # 墙钟时间，仅用于日志
+        self._trigger_ts: Optional[float] = None  # 单调时钟，用于冷却判断
+        self._cooldown_s = 180 * 60
         self.max_daily_loss = 0.0
+        self.reload_config()
+        # 滚动窗口权益峰值：单调递减队列 (t, equity)，队首即窗口内峰值
+        self._peak_window_s = float(config.get("risk_management", {}).get("peak_window_sec", 86400))
+        self._peak_dq = deque()
+
+    def reload_config(self):
+        """
+        将热路径用到的阈值缓存为 float；配置在运行时被修改（如 OpsMonitor 自动修复）后需调用
+        """
+        self._dd_limit = float(self.config["risk_management"]["daily_drawdown_limit_pct"])
+        self._margin_thr = float(self.config["accounting"]["margin_health_threshold"])
 
     # === 核心入口：每轮交易前检查 ===
     def pre_trade_check(self, ev: float) -> bool:
         """
-        每次下单前调用，检查是否允许交易
+        每次下单前调用，检查是否允许交易（单笔版本，委托给 pre_trade_check_batch）
         """
-        if self.circuit_breaker_active:
-            logger.warning("[RISK] Circuit breaker active, trading blocked.")
-            return False
-
-        if ev < -0.05:
-            logger.warning("[RISK] EV too low, reject trade.")
-            return False
+        return bool(self.pre_trade_check_batch(np.array([ev], dtype=np.float64))[0])
 
-        if not self._check_drawdown():
-            return False
+    def pre_trade_check_batch(self, evs: np.ndarray) -> np.ndarray:
+        """
+        批量下单前检查：断路器与账户状态（回撤/保证金）整批只读取一次
+        :param evs: (N,) 候选订单 EV
+        :return: (N,) bool 掩码，True 表示允许交易
+        """
+        evs = np.asarray(evs, dtype=np.float64)
+        if self.check_circuit_breaker():
+            logger.warning("[RISK] Circuit breaker active, trading blocked.")
+            return np.zeros(evs.shape, dtype=bool)
 
-        if not self._check_margin_health():
-            return False
+        ok = evs >= -0.05
+        n_reject = ok.size - int(np.count_nonzero(ok))
+        if n_reject:
+            logger.warning("[RISK] EV too low, reject %d trade(s).", n_reject)
+        if n_reject == ok.size:  # 全部被拒时无需再读取账户
+            return ok
 
-        return True
+        if not self._check_drawdown() or not self._check_margin_health():
+            ok[:] = False
+        return ok
 
     # === 日度回撤控制 ===
     def _check_drawdown(self) -> bool:
@@ -54,26 +82,54 @@ class RiskManager:
         检查账户回撤是否触发风控
         """
         equity = self.accounting.get_equity()
-        peak = self.accounting.get_equity_peak()
+        peak = self._observe_equity(equity)
         drawdown = (peak - equity) / peak if peak > 0 else 0
 
-        if drawdown > self.config["risk_management"]["daily_drawdown_limit_pct"]:
-            logger.error(f"[RISK] Daily drawdown exceeded: {drawdown:.2%}")
+        if drawdown > self._dd_limit:
+            logger.error("[RISK] Daily drawdown exceeded: %.2f%%", drawdown * 100)
             self._trigger_circuit_breaker("Daily drawdown limit hit")
             return False
 
         return True
 
+    # === 滚动权益峰值 ===
+    def on_equity_update(self, t: float, equity: float):
+        """
+        推入一次权益观测（t 为单调时钟秒），均摊 O(1)
+        """
+        dq = self._peak_dq
+        while dq and dq[-1][1] <= equity:
+            dq.pop()
+        dq.append((t, equity))
+        while t - dq[0][0] > self._peak_window_s:
+            dq.popleft()
+
+    def _observe_equity(self, equity: float) -> float:
+        """
+        记录当前权益并返回峰值（见 get_equity_peak）
+        """
+        self.on_equity_update(time.monotonic(), equity)
+        return self.get_equity_peak()
+
+    def get_equity_peak(self) -> float:
+        """
+        权益峰值：窗口峰值与 Accounting 峰值取大。
+        本模块只能看到推送给它的权益点，两次观测之间的高点以 Accounting 为准，回撤不会被低估
+        """
+        peak = self.accounting.get_equity_peak()
+        if self._peak_dq:
+            return max(self._peak_dq[0][1], peak)
+        return peak
+
     # === 保证金健康检查 ===
     def _check_margin_health(self) -> bool:
         """
         检查账户保证金是否足够安全
         """
         margin_ratio = self.accounting.get_margin_ratio()
-        threshold = self.config["accounting"]["margin_health_threshold"]
 
-        if margin_ratio < threshold:
-            logger.error(f"[RISK] Margin ratio too low ({margin_ratio:.2%}), pausing trades.")
+        if margin_ratio < self._margin_thr:
+            logger.error("[RISK] Margin ratio too low (%.2f%%), pausing trades.", margin_ratio * 100)
             self._trigger_circuit_breaker("Margin health breach")
             return False
 
@@ -85,8 +141,9 @@ class RiskManager:
         启动断路器，暂停交易
         """
         self.circuit_breaker_active = True
+        self._trigger_ts = time.monotonic()
         self.last_trigger_time = datetime.utcnow()
-        logger.critical(f"[CIRCUIT BREAKER] Triggered due to: {reason}")
+        logger.critical("[CIRCUIT BREAKER] Triggered due to: %s at %s", reason, self.last_trigger_time)
 
     def check_circuit_breaker(self) -> bool:
         """
@@ -95,8 +152,7 @@ class RiskManager:
         if not self.circuit_breaker_active:
             return False
 
-        cooldown = timedelta(minutes=180)
-        if datetime.utcnow() - self.last_trigger_time > cooldown:
+        if time.monotonic() - self._trigger_ts > self._cooldown_s:
             logger.info("[RISK] Circuit breaker cooldown complete, trading resumed.")
             self.circuit_breaker_active = False
             self.loss_streak = 0
@@ -107,11 +163,16 @@ class RiskManager:
     # === 连续亏损监控 ===
     def register_trade_result(self, pnl: float):
         """
-        每笔交易完成后调用，用于统计连续亏损和自愈策略
+        每笔交易完成后调用，用于统计连续亏损和自愈策略；同时把成交后的权益推入峰值窗口
         """
+        self.on_equity_update(time.monotonic(), self.accounting.get_equity())
         if pnl < 0:
             self.loss_streak += 1
-            self.drawdown_history.append(pnl)
+            old = float(self._dd[self._dd_i])
+            self._dd[self._dd_i] = pnl
+            self._dd_sum += float(self._dd[self._dd_i]) - old
+            self._dd_i = (self._dd_i + 1) % self._dd.size
+            self._dd_n = min(self._dd_n + 1, self._dd.size)
             if self.loss_streak >= 3:
                 self._trigger_circuit_breaker("3-loss streak detected")
         else:
@@ -130,9 +191,9 @@ class RiskManager:
         """
         风险热度指数：根据过去亏损速度和回撤趋势动态调整
         """
-        if not self.drawdown_history:
+        if not self._dd_n:
             return 0.0
-        avg_loss = abs(sum(self.drawdown_history[-10:]) / len(self.drawdown_history[-10:]))
+        avg_loss = abs(self._dd_sum / self._dd_n)
         return min(avg_loss / 0.05, 1.0)  # 正常范围 0-1
 
     # === 对冲策略 ===
@@ -153,7 +214,7 @@ class RiskManager:
         当回撤 > 20% → 自动切换为低风险策略组合（T4/T5）
         """
         equity = self.accounting.get_equity()
-        peak = self.accounting.get_equity_peak()
+        peak = self._observe_equity(equity)
         drawdown = (peak - equity) / peak if peak > 0 else 0
 
         if drawdown > 0.20:
@@ -6,14 +6,60 @@ CALDROS-GTO V19 | signal_engine/core.py
 信号引擎：多维信号融合 + 贝叶斯EV决策 + 动态权重与共识机制
 """
 
+import time
 import numpy as np
 import logging
 import asyncio
-from typing import Dict, Any, List, Tuple
-from collections import deque
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple, Optional, NamedTuple
+
+from caldros_gto.common.logs import RateLimitFilter
+from caldros_gto.common.timefmt import iso_utc
+from caldros_gto.signal_engine._kernels import ev_and_tier, set_threads
 
 logger = logging.getLogger("SignalEngine")
+# 每轮信号更新日志单独限流
+tick_logger = logging.getLogger("SignalEngine.tick")
+tick_logger.addFilter(RateLimitFilter())
+
+# 特征名 → 缺失时的默认值
+_FEATURE_DEFAULTS = {
+    "price_velocity": 0.0,
+    "volume_acceleration": 0.0,
+    "liquidation_heat": 0.0,
+    "order_imbalance": 0.0,
+    "funding_bias": 0.0,
+    "macro_sentiment_score": 0.0,
+    "onchain_score": 0.0,
+    "etf_flow_score": 0.0,
+    "social_sentiment_score": 0.0,
+    "volatility": 1.0
+}
+# 融合分量（特征矩阵与权重向量的列序）
+_FEATURE_ORDER = (
+    "breakout", "momentum", "whale_flow", "orderbook_imbalance", "funding_flip",
+    "macro_sentiment", "onchain_flow", "etf_flow", "social_sentiment"
+)
+# EV 分层阈值（升序）与层级名称（由低到高）
+_TIER_CUTS = np.array([-0.02, 0.03, 0.10, 0.20, 0.35])
+_TIERS = np.array(["T6_defensive", "T5_scalping", "T4_neutral", "T3_moderate", "T2_strong", "T1_explosive"], dtype=object)
+
+# 历史信号环形缓冲区：容量与行结构（t = Unix 纳秒，sym = 交易对编号，tier = _TIERS 下标）
+HISTORY_SIZE = 1000
+_HISTORY_DTYPE = np.dtype([("t", "i8"), ("sym", "i2"), ("score", "f4"), ("ev", "f4"), ("tier", "i1")])
+
+# 融合归一化常量（预先取倒数，以乘代除；float32 避免列运算被提升为 float64）
+_INV5 = np.float32(0.2)
+_INV10 = np.float32(0.1)
+_ONE = np.float32(1.0)
+
+class Signal(NamedTuple):
+    """单个交易对的信号快照；components 仅在 keep_components=True 时填充"""
+    score: float
+    ev: float
+    tier: str
+    components: Optional[Dict[str, float]] = None
+
 
 class SignalEngine:
     def __init__(self, config: Dict[str, Any], feature_source):
@@ -24,133 +70,200 @@ class SignalEngine:
         self.config = config
         self.feature_source = feature_source
         self.signals = {}
-        self.history = deque(maxlen=1000)
+        # 单线程计算池：NumPy/Numba 计算不阻塞事件循环，且批次之间天然串行
+        # （Numba 并行内核不支持多个线程并发调用）；kernel_threads 限制内核并行度，缺省用满 NUMBA_NUM_THREADS
+        kernel_threads = config["signal_engine"].get("kernel_threads")
+        self._pool = ThreadPoolExecutor(
+            1, thread_name_prefix="signal-compute",
+            initializer=set_threads if kernel_threads else None,
+            initargs=(kernel_threads,) if kernel_threads else ()
+        )
+        self._hist = np.zeros(HISTORY_SIZE, dtype=_HISTORY_DTYPE)
+        self._hist_i = 0  # 累计写入行数
+        self._symbol_ids: Dict[str, int] = {}
+        self.symbol_names: List[str] = []  # 交易对编号 → 名称
         self.weights = config["signal_engine"]["fusion_logic"]["weights"]
+        for k in _FEATURE_ORDER:  # 启动时补齐缺失分量，融合阶段可直接索引
+            self.weights.setdefault(k, 0.0)
+        self._rebuild_weights()
+        # 是否输出逐分量 breakdown（默认关闭，仅调试/归因时开启）
+        self.keep_components = config["signal_engine"].get("keep_components", False)
         self.activation_threshold = config["signal_engine"]["fusion_logic"]["activation_threshold"]
+        if self.activation_threshold is None:
+            raise ValueError("signal_engine.fusion_logic.activation_threshold 未配置")
         self.consistency_threshold = config["signal_engine"]["fusion_logic"]["consistency_factor"]["threshold"]
 
+        # 预热 JIT：用长度为 1 的样本触发编译，避免首个真实批次承担编译耗时。
+        # 必须在主线程执行：Numba workqueue 线程池若首次由非主线程拉起，进程退出时会挂起
+        ev_and_tier(np.zeros(1), np.zeros(1, np.float32), np.zeros(1, np.float32), 0.0, _TIER_CUTS)
+
     async def run(self):
         """主循环：持续计算信号"""
         logger.info("🧠 启动信号融合引擎...")
+        loop = asyncio.get_running_loop()
         while True:
             try:
                 features = self.feature_source.get_features()
-                self.signals = self._compute_signals(features)
-                logger.info("✅ 信号更新完成 %d 个交易对", len(self.signals))
-            except Exception as e:
-                logger.error(f"❌ 信号计算失败: {e}")
+                # 在工作线程中构建新字典，完成后整体替换，读者不会看到半更新状态
+                new_signals = await loop.run_in_executor(self._pool, self._compute_signals, features)
+                self.signals = new_signals
+                if tick_logger.isEnabledFor(logging.INFO):
+                    tick_logger.info("✅ 信号更新完成 %d 个交易对", len(new_signals))
+            except (ValueError, TypeError) as e:  # 特征源数据异常（如非数值字符串），跳过本轮
+                self.signals = {}  # 不让下游继续基于过期信号交易
+                logger.error("❌ 信号计算失败: %s", e)
+            except Exception:
+                # 非预期异常：清空信号并记录堆栈后抛出（任务为 fire-and-forget，不记录则无人可见）
+                self.signals = {}
+                logger.exception("❌ 信号引擎异常退出")
+                raise
             await asyncio.sleep(10)
 
-    def _compute_signals(self, features: Dict[str, Any]) -> Dict[str, Any]:
+    def _compute_signals(self, features: Dict[str, Any]) -> Dict[str, Signal]:
         """
-        计算所有交易对的最终信号评分
-        :return: {symbol: {signal_score, EV, tier, breakdown}}
+        计算所有交易对的最终信号评分（按特征列向量化，一次处理全部交易对）
+        :return: {symbol: Signal}
         """
-        signals = {}
-        for symbol, feat in features.items():
-            score_breakdown, weighted_score = self._fusion(feat)
-            ev, tier = self._ev_classify(weighted_score, feat)
-
-            signals[symbol] = {
-                "signal_score": weighted_score,
-                "EV_estimate": ev,
-                "tier": tier,
-                "components": score_breakdown
-            }
-
-            # 存储历史，用于回测/AI再训练
-            self.history.append({
-                "t": datetime.utcnow().isoformat(),
-                "symbol": symbol,
-                "score": weighted_score,
-                "ev": ev,
-                "tier": tier
-            })
+        t = time.time_ns()  # 批次时间戳：整批只取一次，格式化推迟到导出时
+        symbols, cols = self._features_to_arrays(features)
+        feat_mat, weighted_score = self._fusion(cols)
+        ev, tier_id = self._ev_classify(weighted_score, cols)
 
+        columns = [weighted_score.tolist(), ev.tolist(), _TIERS[tier_id]]
+        if self.keep_components:
+            columns.append([dict(zip(_FEATURE_ORDER, row)) for row in (feat_mat * self._w).tolist()])
+        signals = dict(zip(symbols, map(Signal, *columns)))
+
+        # 存储历史，用于回测/AI再训练
+        self._record_history(t, symbols, weighted_score, ev, tier_id)
         return signals
 
-    def _fusion(self, feat: Dict[str, Any]) -> Tuple[Dict[str, float], float]:
+    def _record_history(self, t: int, symbols: List[str], score: np.ndarray, ev: np.ndarray, tier_id: np.ndarray):
+        """批量写入历史环形缓冲区（同一批次共用一个时间戳）"""
+        n = len(symbols)
+        if n == 0:
+            return
+        if n > HISTORY_SIZE:  # 单批超过容量时只保留最后 HISTORY_SIZE 行
+            skip = n - HISTORY_SIZE
+            self._hist_i += skip
+            symbols, score, ev, tier_id = symbols[skip:], score[skip:], ev[skip:], tier_id[skip:]
+            n = HISTORY_SIZE
+
+        rows = (self._hist_i + np.arange(n)) % HISTORY_SIZE
+        hist = self._hist
+        hist["t"][rows] = t
+        hist["sym"][rows] = [self._symbol_id(s) for s in symbols]
+        hist["score"][rows] = score
+        hist["ev"][rows] = ev
+        hist["tier"][rows] = tier_id
+        self._hist_i += n
+
+    def _symbol_id(self, symbol: str) -> int:
+        sid = self._symbol_ids.get(symbol)
+        if sid is None:
+            sid = self._symbol_ids[symbol] = len(self.symbol_names)
+            self.symbol_names.append(symbol)
+        return sid
+
+    def _features_to_arrays(self, features: Dict[str, Any]) -> Tuple[List[str], Dict[str, np.ndarray]]:
         """
-        信号融合逻辑：技术面 + 资金面 + 信息面 + 链上
-        输出加权得分
+        将 {symbol: {feature: value}} 转为 SoA 布局：每个特征一条连续 float32 数组，行序与 symbols 一致
         """
-        breakdown = {}
-        total_score = 0.0
+        symbols = list(features)
+        n = len(symbols)
+        cols = {
+            key: np.fromiter((features[s].get(key, default) for s in symbols), dtype=np.float32, count=n)
+            for key, default in _FEATURE_DEFAULTS.items()
+        }
 
-        # 📈 Breakout 信号
-        breakout = 1 if feat.get("price_velocity", 0) > 0.0005 else 0
-        breakdown["breakout"] = breakout * self.weights["breakout"]
+        # None/inf 会被 fromiter 转为 NaN/inf 并穿过 fastmath 内核：含非有限值的交易对本轮剔除
+        finite = np.logical_and.reduce([np.isfinite(c) for c in cols.values()])
+        if not finite.all():
+            bad = [s for s, ok in zip(symbols, finite.tolist()) if not ok]
+            logger.warning("⚠️ 特征含非有限值，本轮剔除 %d 个交易对: %s", len(bad), bad[:10])
+            symbols = [s for s, ok in zip(symbols, finite.tolist()) if ok]
+            cols = {key: col[finite] for key, col in cols.items()}
+        return symbols, cols
 
-        # ⚡ Momentum 信号（成交量加速度）
-        momentum = min(feat.get("volume_acceleration", 0) / 5, 1)
-        breakdown["momentum"] = momentum * self.weights["momentum"]
+    def _rebuild_weights(self):
+        """按 _FEATURE_ORDER 将权重字典预展开为 float32 向量；修改 self.weights 后需重新调用"""
+        self._w = np.array([self.weights[k] for k in _FEATURE_ORDER], dtype=np.float32)
 
+    def _fusion(self, cols: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        信号融合逻辑：技术面 + 资金面 + 信息面 + 链上
+        输出未加权的 (N, 9) 特征矩阵（列序见 _FEATURE_ORDER）与 (N,) 加权得分（一次 GEMV）
+        """
+        # 列主序预分配：每列连续，各分量直接以 out= 写入，无临时数组与 column_stack 拷贝
+        feat_mat = np.empty((cols["price_velocity"].size, len(_FEATURE_ORDER)), dtype=np.float32, order="F")
+        f = feat_mat.T  # f[k] 为第 k 个分量的连续视图
+        # 📈 Breakout 信号
+        np.greater(cols["price_velocity"], 0.0005, out=f[0], casting="unsafe")
+        # ⚡ Momentum 信号（成交量加速度）
+        np.minimum(np.multiply(cols["volume_acceleration"], _INV5, out=f[1]), _ONE, out=f[1])
         # 🐋 Whale Flow 信号
-        whale = min(feat.get("liquidation_heat", 0) / 10, 1)
-        breakdown["whale_flow"] = whale * self.weights["whale_flow"]
-
+        np.minimum(np.multiply(cols["liquidation_heat"], _INV10, out=f[2]), _ONE, out=f[2])
         # 🪙 Orderbook Imbalance（流动性偏向）
-        ob_imbalance = min(abs(feat.get("order_imbalance", 0)), 1)
-        breakdown["orderbook_imbalance"] = ob_imbalance * self.weights["orderbook_imbalance"]
-
+        np.minimum(np.abs(cols["order_imbalance"], out=f[3]), _ONE, out=f[3])
         # 📉 Funding Flip（资金方向信号）
-        funding_flip = 0.2 if feat.get("funding_bias", 0) > 0 else -0.2
-        breakdown["funding_flip"] = funding_flip * self.weights["funding_flip"]
-
+        f[4] = np.where(cols["funding_bias"] > 0, np.float32(0.2), np.float32(-0.2))
         # 📢 信息面信号（宏观/社媒/ETF等）
-        info_signal = feat.get("macro_sentiment_score", 0)
-        breakdown["macro_sentiment"] = info_signal * self.weights["macro_sentiment"]
-
+        f[5] = cols["macro_sentiment_score"]
         # 🔗 链上信号（鲸鱼地址活跃度等）
-        onchain = feat.get("onchain_score", 0)
-        breakdown["onchain_flow"] = onchain * self.weights["onchain_flow"]
-
+        f[6] = cols["onchain_score"]
         # 🧪 ETF 流入
-        etf_flow = feat.get("etf_flow_score", 0)
-        breakdown["etf_flow"] = etf_flow * self.weights.get("etf_flow", 0)
-
+        f[7] = cols["etf_flow_score"]
         # 🧠 社交舆情
-        social = feat.get("social_sentiment_score", 0)
-        breakdown["social_sentiment"] = social * self.weights.get("social_sentiment", 0)
+        f[8] = cols["social_sentiment_score"]
 
         # 汇总总分
-        total_score = sum(breakdown.values())
-        return breakdown, total_score
+        return feat_mat, feat_mat @ self._w
 
-    def _ev_classify(self, score: float, feat: Dict[str, Any]) -> Tuple[float, str]:
+    def _ev_classify(self, score: np.ndarray, cols: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
         """
-        根据信号分数和特征计算 EV 并分层
+        根据信号分数和特征计算 EV 并分层，返回 (ev, tier_id)，tier_id 为 _TIERS 下标
+        胜率估计为 Sigmoid 转换（贝叶斯+RL），EV 扣除手续费；计算在 Numba 内核中完成（见 _kernels.ev_and_tier）
         """
-        # 胜率估计：Sigmoid 转换（贝叶斯+RL）
-        p = 1 / (1 + np.exp(-6 * (score - self.activation_threshold)))
-        G = 1.0 + 2.5 * feat.get("volume_acceleration", 0) / 5
-        L = 1.0 + feat.get("volatility", 1.0)
-
-        ev = p * G - (1 - p) * L - 0.0016  # 减去手续费
-
-        if ev >= 0.35:
-            tier = "T1_explosive"
-        elif ev >= 0.20:
-            tier = "T2_strong"
-        elif ev >= 0.10:
-            tier = "T3_moderate"
-        elif ev >= 0.03:
-            tier = "T4_neutral"
-        elif ev >= -0.02:
-            tier = "T5_scalping"
-        else:
-            tier = "T6_defensive"
-
-        return ev, tier
-
-    def get_signal(self, symbol: str) -> Dict[str, Any]:
-        """单一币种信号查询"""
-        return self.signals.get(symbol, {})
-
-    def get_all_signals(self) -> Dict[str, Any]:
+        ev, tier_id = ev_and_tier(
+            score.astype(np.float64, copy=False),
+            cols["volume_acceleration"],
+            cols["volatility"],
+            float(self.activation_threshold),
+            _TIER_CUTS
+        )
+        return ev, tier_id
+
+    def get_signal(self, symbol: str) -> Optional[Signal]:
+        """单一币种信号查询（无信号时返回 None）"""
+        return self.signals.get(symbol)
+
+    def get_all_signals(self) -> Dict[str, Signal]:
         """获取所有当前信号"""
         return self.signals
 
-    def get_historical_signals(self) -> List[Dict[str, Any]]:
-        """获取历史信号轨迹（用于AI再训练）"""
-        return list(self.history)
+    def get_historical_signals(self) -> np.ndarray:
+        """
+        获取历史信号轨迹（用于AI再训练）
+        :return: 按时间先后排列的结构化数组副本，字段见 _HISTORY_DTYPE；
+                 sym 为 symbol_names 下标，tier 为 _TIERS 下标
+        """
+        if self._hist_i <= HISTORY_SIZE:
+            return self._hist[:self._hist_i].copy()
+        start = self._hist_i % HISTORY_SIZE
+        return np.concatenate((self._hist[start:], self._hist[:start]))
+
+    def export_historical_signals(self) -> List[Dict[str, Any]]:
+        """
+        导出历史信号为 JSON 友好的字典列表（t 为 UTC ISO 字符串，仅在导出时格式化）
+        """
+        hist = self.get_historical_signals()
+        names = self.symbol_names
+        return [
+            {"t": self._fmt_ts(t), "symbol": names[sym], "score": score, "ev": ev, "tier": _TIERS[tier]}
+            for t, sym, score, ev, tier in hist.tolist()
+        ]
+
+    @staticmethod
+    def _fmt_ts(ns: int) -> str:
+        """Unix 纳秒 → 统一的 UTC ISO 8601 字符串（见 common.timefmt.iso_utc）"""
+        return iso_utc(ns // 1_000_000_000)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CALDROS-GTO | tests/test_ev_engine.py
+回归测试：calculate_ev_batch 与逐币种 calculate_ev_for_symbol 一致
+"""
+
+import json
+import math
+import random
+from pathlib import Path
+
+from caldros_gto.ev_engine.core import EVEngine
+from caldros_gto.signal_engine.core import Signal
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "production.json"
+
+_STATE_KEYS = {
+    "volatility": (0.0, 1.5),
+    "trend_consistency": (-1.0, 1.0),
+    "ATR": (0.0, 0.1),
+    "momentum": (0.0, 3.0),
+    "liquidity_score": (0.1, 2.0),
+    "depth_score": (0.1, 2.0),
+    "slippage": (0.0, 0.05),
+    "funding_rate": (-0.01, 0.01),
+}
+
+
+class _SignalSource:
+    """替身信号源：只提供 get_signal"""
+
+    def __init__(self, signals):
+        self.signals = signals
+
+    def get_signal(self, symbol):
+        return self.signals.get(symbol)
+
+
+def _make_engine(signals):
+    return EVEngine(json.loads(CONFIG_PATH.read_text()), _SignalSource(signals))
+
+
+def _random_case(n: int, seed: int = 0):
+    """随机信号与市场状态：部分状态字段缺失以覆盖默认值，部分币种无信号"""
+    rng = random.Random(seed)
+    symbols = [f"SYM{i}USDT" for i in range(n)]
+    signals = {
+        s: Signal(score=rng.uniform(-0.5, 1.5), ev=0.0, tier="T4_neutral", components={"breakout": 0.2})
+        for s in symbols if rng.random() < 0.9
+    }
+    states = [
+        {key: rng.uniform(lo, hi) for key, (lo, hi) in _STATE_KEYS.items() if rng.random() < 0.8}
+        for _ in symbols
+    ]
+    return symbols, states, signals
+
+
+def test_batch_matches_scalar():
+    symbols, states, signals = _random_case(200)
+    batch_engine = _make_engine(signals)
+    scalar_engine = _make_engine(signals)
+
+    # 跑两轮：第二轮的胜率依赖第一轮写入的逐币种胜负计数
+    for _ in range(2):
+        batch = batch_engine.calculate_ev_batch(symbols, states)
+        scalar = [scalar_engine.calculate_ev_for_symbol(s, st) for s, st in zip(symbols, states)]
+        scalar = [r for r in scalar if r]
+
+        assert [r["symbol"] for r in batch] == [r["symbol"] for r in scalar]
+        for b, s in zip(batch, scalar):
+            for key in ("p_win", "G", "L", "EV", "kelly_position"):
+                assert math.isclose(b[key], s[key], rel_tol=1e-9, abs_tol=1e-12), (b["symbol"], key)
+            assert b["tier"] == s["tier"]
+            assert b["components"] is s["components"]
+
+            # 杠杆为随机值，只校验落在层级区间内
+            low, high = batch_engine._lev_ranges[list(batch_engine._tier_names).index(b["tier"])]
+            assert low <= b["recommended_leverage"] <= high
+            assert low <= s["recommended_leverage"] <= high
+
+    assert batch_engine.history_by_symbol == scalar_engine.history_by_symbol
+
+
+def test_batch_without_signals():
+    engine = _make_engine({})
+    assert engine.calculate_ev_batch(["BTCUSDT"], [{}]) == []
+    assert engine.calculate_ev_for_symbol("BTCUSDT", {}) == {}
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CALDROS-GTO | tests/test_executor.py
+回归测试：风控掩码只拦截开仓与轮换，不拦截退出
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+from caldros_gto.execution_system.executor import ExecutionEngine
+from caldros_gto.risk_management.manager import RiskManager
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "production.json"
+
+
+class _Accounting:
+    def get_equity(self):
+        return 100.0
+
+    def get_equity_peak(self):
+        return 100.0
+
+    def get_margin_ratio(self):
+        return 1.0
+
+    def get_available_balance(self):
+        return 1000.0
+
+
+class _EVEngine:
+    """替身 EVEngine：calculate_ev_batch 返回预设结果"""
+
+    def __init__(self, results):
+        self.results = results
+
+    def calculate_ev_batch(self, symbols, states):
+        return [r for r in self.results if r["symbol"] in symbols]
+
+
+def _ev_result(symbol, ev, p_win=0.6):
+    return {
+        "symbol": symbol, "p_win": p_win, "G": 1.0, "L": 1.0, "EV": ev, "tier": "T2_strong",
+        "kelly_position": 0.1, "recommended_leverage": 10, "components": None
+    }
+
+
+def _make_executor(results):
+    config = json.loads(CONFIG_PATH.read_text())
+    accounting = _Accounting()
+    risk_manager = RiskManager(accounting, config)
+    return ExecutionEngine(None, _EVEngine(results), accounting, risk_manager, config)
+
+
+def _open_position(engine, symbol, ev_entry):
+    engine.active_positions[symbol] = {
+        "entry_time": datetime.utcnow(), "entry_price": 0, "leverage": 10, "notional": 100.0,
+        "ev_entry": ev_entry, "direction": "BUY", "open": True
+    }
+
+
+def test_breaker_blocks_entries_and_rotation_but_not_exits():
+    engine = _make_executor([
+        _ev_result("EXITUSDT", -0.1),   # 信号失效且 EV < -0.05：风控拒绝，但仍需平仓
+        _ev_result("HOLDUSDT", 0.9),    # 高 EV 持仓：风控不放行时不得轮换
+        _ev_result("NEWUSDT", 0.9),     # 无仓位高 EV：风控不放行时不得开仓
+    ])
+    _open_position(engine, "EXITUSDT", 0.2)
+    _open_position(engine, "HOLDUSDT", 0.2)
+    engine.risk_manager._trigger_circuit_breaker("test")
+
+    engine.execute_cycle({"EXITUSDT": {}, "HOLDUSDT": {}, "NEWUSDT": {}})
+
+    assert "EXITUSDT" not in engine.active_positions
+    assert "EXITUSDT" in engine.cooldowns
+    assert "HOLDUSDT" in engine.active_positions and "HOLDUSDT" not in engine.cooldowns
+    assert "NEWUSDT" not in engine.active_positions
+    assert engine.trade_log == []
+
+
+def test_low_ev_symbol_does_not_block_others():
+    engine = _make_executor([_ev_result("BADUSDT", -0.1), _ev_result("NEWUSDT", 0.9)])
+    engine.execute_cycle({"BADUSDT": {}, "NEWUSDT": {}})
+    assert list(engine.active_positions) == ["NEWUSDT"]
+    assert len(engine.trade_log) == 1
+
+
+def test_cooldown_skips_symbol():
+    engine = _make_executor([_ev_result("NEWUSDT", 0.9)])
+    engine._exit_position("NEWUSDT", reason="test")  # 无仓位时不设冷却
+    assert "NEWUSDT" not in engine.cooldowns
+    _open_position(engine, "NEWUSDT", 0.9)
+    engine._exit_position("NEWUSDT", reason="test")
+    engine.execute_cycle({"NEWUSDT": {}})
+    assert "NEWUSDT" not in engine.active_positions
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CALDROS-GTO | tests/test_ops_monitor.py
+回归测试：AsyncAlerter 去重与后台推送任务的容错
+"""
+
+import asyncio
+
+from caldros_gto.ops_monitor.monitor import AsyncAlerter
+
+
+class _BrokenSession:
+    """替身会话：第一次 post 抛出非网络异常，之后记录发送内容"""
+
+    def __init__(self):
+        self.sent = []
+        self.calls = 0
+
+    def post(self, url, json):
+        self.calls += 1
+        if self.calls == 1:
+            raise ValueError("boom")
+        self.sent.append(json["text"])
+        return _Response()
+
+
+class _Response:
+    status = 200
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_dropped_alert_does_not_block_key():
+    async def scenario():
+        alerter = AsyncAlerter("http://example.invalid", maxsize=1)
+        alerter._queue = asyncio.Queue(maxsize=1)
+        alerter._put("first", "a")
+        alerter._put("second", "b")  # 队列已满，被丢弃
+        assert "b" not in alerter._last_sent
+        alerter._queue.get_nowait()
+        alerter._put("second", "b")  # 腾出空间后同 key 告警可立即入队
+        assert alerter._queue.get_nowait() == "second"
+
+    asyncio.run(scenario())
+
+
+def test_drain_survives_unexpected_error():
+    async def scenario():
+        alerter = AsyncAlerter("http://example.invalid")
+        alerter._queue = asyncio.Queue()
+        alerter._session = session = _BrokenSession()
+        task = asyncio.create_task(alerter._drain())
+        alerter._queue.put_nowait("first")
+        alerter._queue.put_nowait("second")
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert not task.done()
+        assert session.sent == ["second"]
+        task.cancel()
+
+    asyncio.run(scenario())
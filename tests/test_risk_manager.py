@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CALDROS-GTO | tests/test_risk_manager.py
+回归测试：RiskManager 批量下单前检查、回撤断路器与权益峰值
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from caldros_gto.risk_management.manager import RiskManager
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "production.json"
+
+
+class _Accounting:
+    """替身 Accounting：权益、峰值与保证金率由测试直接设置"""
+
+    def __init__(self, equity=100.0, peak=100.0, margin_ratio=1.0):
+        self.equity = equity
+        self.peak = peak
+        self.margin_ratio = margin_ratio
+        self.reads = 0
+
+    def get_equity(self):
+        self.reads += 1
+        return self.equity
+
+    def get_equity_peak(self):
+        self.reads += 1
+        return self.peak
+
+    def get_margin_ratio(self):
+        self.reads += 1
+        return self.margin_ratio
+
+
+def _make_manager(accounting):
+    return RiskManager(accounting, json.loads(CONFIG_PATH.read_text()))
+
+
+def test_peak_between_checks_trips_breaker():
+    acc = _Accounting(equity=100.0, peak=100.0)
+    rm = _make_manager(acc)
+    assert rm.pre_trade_check(0.1)  # 以权益 100 完成首次观测
+
+    # 两次检查之间 Accounting 峰值涨到 130，当前权益 110：回撤 15.4% > 15%
+    acc.peak, acc.equity = 130.0, 110.0
+    assert rm.get_equity_peak() == 130.0
+    assert not rm.pre_trade_check(0.1)
+    assert rm.circuit_breaker_active
+
+
+def test_trade_result_feeds_peak_window():
+    acc = _Accounting(equity=100.0, peak=100.0)
+    rm = _make_manager(acc)
+    acc.equity = 125.0
+    rm.register_trade_result(25.0)  # 成交后的权益进入峰值窗口
+    acc.equity = 105.0
+    assert rm.get_equity_peak() == 125.0
+    assert not rm.pre_trade_check(0.1)  # (125 - 105) / 125 = 16% > 15%
+
+
+def test_batch_mask_combinations():
+    # 断路器生效：整批拒绝
+    rm = _make_manager(_Accounting())
+    rm._trigger_circuit_breaker("test")
+    assert rm.pre_trade_check_batch(np.array([0.2, 0.0])).tolist() == [False, False]
+
+    # EV < -0.05 的单笔被拒，其余放行
+    rm = _make_manager(_Accounting())
+    assert rm.pre_trade_check_batch(np.array([0.2, -0.06, -0.05])).tolist() == [True, False, True]
+
+    # 回撤超限：整批拒绝并触发断路器
+    rm = _make_manager(_Accounting(equity=80.0, peak=100.0))
+    assert rm.pre_trade_check_batch(np.array([0.2, 0.1])).tolist() == [False, False]
+    assert rm.circuit_breaker_active
+
+    # 保证金不足：整批拒绝并触发断路器
+    rm = _make_manager(_Accounting(margin_ratio=0.1))
+    assert rm.pre_trade_check_batch(np.array([0.2, 0.1])).tolist() == [False, False]
+    assert rm.circuit_breaker_active
+
+
+def test_batch_skips_accounting_when_nothing_to_check():
+    acc = _Accounting()
+    rm = _make_manager(acc)
+    assert rm.pre_trade_check_batch(np.zeros(0)).size == 0
+    assert rm.pre_trade_check_batch(np.array([-0.5, -0.1])).tolist() == [False, False]
+    assert acc.reads == 0
+
+
+def test_scalar_matches_batch():
+    cases = [
+        dict(equity=100.0, peak=100.0, margin_ratio=1.0),
+        dict(equity=80.0, peak=100.0, margin_ratio=1.0),
+        dict(equity=100.0, peak=100.0, margin_ratio=0.1),
+    ]
+    for case in cases:
+        for ev in (0.3, 0.0, -0.05, -0.06):
+            scalar = _make_manager(_Accounting(**case)).pre_trade_check(ev)
+            batch = _make_manager(_Accounting(**case)).pre_trade_check_batch(np.array([ev]))
+            assert scalar is bool(batch[0]), (case, ev)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CALDROS-GTO | tests/test_signal_engine.py
+回归测试：向量化 _compute_signals 与逐币种标量公式一致
+"""
+
+import json
+import math
+import random
+from pathlib import Path
+
+import numpy as np
+
+from caldros_gto.signal_engine.core import SignalEngine, _FEATURE_DEFAULTS, _TIER_CUTS
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "production.json"
+
+
+def _load_config():
+    return json.loads(CONFIG_PATH.read_text())
+
+
+def _scalar_signal(feat, weights, thr):
+    """逐币种参考实现（向量化之前的融合与 EV 分层公式）"""
+    breakdown = {
+        "breakout": (1 if feat.get("price_velocity", 0) > 0.0005 else 0) * weights["breakout"],
+        "momentum": min(feat.get("volume_acceleration", 0) / 5, 1) * weights["momentum"],
+        "whale_flow": min(feat.get("liquidation_heat", 0) / 10, 1) * weights["whale_flow"],
+        "orderbook_imbalance": min(abs(feat.get("order_imbalance", 0)), 1) * weights["orderbook_imbalance"],
+        "funding_flip": (0.2 if feat.get("funding_bias", 0) > 0 else -0.2) * weights["funding_flip"],
+        "macro_sentiment": feat.get("macro_sentiment_score", 0) * weights["macro_sentiment"],
+        "onchain_flow": feat.get("onchain_score", 0) * weights["onchain_flow"],
+        "etf_flow": feat.get("etf_flow_score", 0) * weights.get("etf_flow", 0),
+        "social_sentiment": feat.get("social_sentiment_score", 0) * weights.get("social_sentiment", 0),
+    }
+    score = sum(breakdown.values())
+
+    p = 1 / (1 + math.exp(-6 * (score - thr)))
+    G = 1.0 + 2.5 * feat.get("volume_acceleration", 0) / 5
+    L = 1.0 + feat.get("volatility", 1.0)
+    ev = p * G - (1 - p) * L - 0.0016
+
+    if ev >= 0.35:
+        tier = "T1_explosive"
+    elif ev >= 0.20:
+        tier = "T2_strong"
+    elif ev >= 0.10:
+        tier = "T3_moderate"
+    elif ev >= 0.03:
+        tier = "T4_neutral"
+    elif ev >= -0.02:
+        tier = "T5_scalping"
+    else:
+        tier = "T6_defensive"
+    return score, ev, tier, breakdown
+
+
+def _random_features(n: int, seed: int = 0):
+    """随机特征集：数值取 float32 可精确表示的值，部分特征随机缺失"""
+    rng = random.Random(seed)
+    features = {}
+    for i in range(n):
+        feat = {}
+        for key in _FEATURE_DEFAULTS:
+            if rng.random() < 0.8:
+                value = rng.uniform(0, 0.5) if key == "volatility" else rng.uniform(-2, 12)
+                feat[key] = float(np.float32(value))
+        feat["price_velocity"] = float(np.float32(rng.choice([0.0, 0.0004, 0.0006, 0.01])))
+        features[f"SYM{i}USDT"] = feat
+    return features
+
+
+def test_compute_signals_matches_scalar_formula():
+    engine = SignalEngine(_load_config(), feature_source=None)
+    engine.keep_components = True
+    features = _random_features(200)
+
+    signals = engine._compute_signals(features)
+    assert list(signals) == list(features)
+
+    for symbol, feat in features.items():
+        score, ev, tier, breakdown = _scalar_signal(feat, engine.weights, engine.activation_threshold)
+        sig = signals[symbol]
+        assert math.isclose(sig.score, score, abs_tol=1e-5)
+        assert math.isclose(sig.ev, ev, abs_tol=1e-5)
+        # float32 舍入可能让恰好落在分界线附近的 EV 换层，只比较远离分界线的样本
+        if np.abs(_TIER_CUTS - ev).min() > 1e-5:
+            assert sig.tier == tier
+        for name, value in breakdown.items():
+            assert math.isclose(sig.components[name], value, abs_tol=1e-6)
+
+
+def test_components_omitted_by_default():
+    engine = SignalEngine(_load_config(), feature_source=None)
+    signals = engine._compute_signals(_random_features(5))
+    assert all(sig.components is None for sig in signals.values())
+
+
+def test_non_finite_features_are_dropped():
+    engine = SignalEngine(_load_config(), feature_source=None)
+    signals = engine._compute_signals({
+        "AUSDT": {"volatility": None},
+        "BUSDT": {"price_velocity": float("inf")},
+        "CUSDT": {},
+    })
+    assert list(signals) == ["CUSDT"]
+    assert math.isfinite(signals["CUSDT"].ev)